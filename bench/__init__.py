@@ -0,0 +1,11 @@
+"""Benchmarks for the web and desktop hot paths.
+
+    python -m bench.generate bench.db                # 1k users, 500k tasks
+    python -m bench.run bench.db -o new.json         # timed scenarios
+    python -m bench.compare old.json new.json        # flag regressions
+    python -m bench.load bench.db --rate 50          # concurrent traffic
+
+Both apps read DAILY_WORK_DB, so the scenarios run against the generated
+file and never touch the real daily_work.db. The scenarios add tasks and
+update progress, so treat a bench database as disposable.
+"""
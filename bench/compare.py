@@ -0,0 +1,44 @@
+"""Compare two bench.run result files.
+
+    python -m bench.compare old.json new.json --threshold 0.2
+
+Exits 1 when any scenario's median got slower than the threshold allows
+(0.2 = 20%), so it can gate a change in a script.
+"""
+import argparse, json, sys
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def compare(old, new, threshold=0.2, metric="median_ms"):
+    """(name, old, new, ratio, regressed) for every scenario in both runs."""
+    rows = []
+    for name, stats in new["scenarios"].items():
+        if name not in old["scenarios"]:
+            continue
+        a, b = old["scenarios"][name][metric], stats[metric]
+        ratio = b / a if a else float("inf") if b else 1.0
+        rows.append((name, a, b, ratio, ratio > 1 + threshold))
+    return rows
+
+def report(rows, out=sys.stdout):
+    print(f"{'scenario':<32}{'old ms':>10}{'new ms':>10}{'change':>9}", file=out)
+    for name, a, b, ratio, bad in rows:
+        print(f"{name:<32}{a:>10.2f}{b:>10.2f}{ratio - 1:>+9.0%}{'  REGRESSED' if bad else ''}", file=out)
+    return sum(r[4] for r in rows)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m bench.compare", description=__doc__.splitlines()[0])
+    ap.add_argument("old")
+    ap.add_argument("new")
+    ap.add_argument("--threshold", type=float, default=0.2)
+    ap.add_argument("--metric", default="median_ms", choices=("min_ms", "median_ms", "p95_ms", "mean_ms"))
+    a = ap.parse_args(argv)
+    bad = report(compare(load(a.old), load(a.new), a.threshold, a.metric))
+    if bad:
+        print(f"{bad} scenario(s) regressed by more than {a.threshold:.0%}", file=sys.stderr)
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Fill a database with synthetic users and tasks.
+
+    python -m bench.generate bench.db --users 1000 --tasks 500000
+
+Every user's password is their username. Work is skewed the way it is on
+the floor: a few engineers, officers and technicians own most tasks, most
+tasks are Completed, few are Urgent. Rows go in through the normal schema,
+so the version, status-count and search triggers all fire.
+"""
+import argparse, os, random, sys, time
+from datetime import datetime, timedelta
+
+ROLES = (("admin", 0.01), ("engineer", 0.29), ("officer", 0.20), ("technician", 0.50))
+STATUS = (("Completed", 70), ("Running", 20), ("Pending", 10))
+URGENCY = (("Regular", 85), ("Urgent", 15))
+MODEL = (("12K", 50), ("18K", 30), ("24K", 20))
+WORDS = ("compressor condenser evaporator leak check replace fan motor coil pcb "
+         "sensor valve line display sample tube pipe gas charge test eva distribution").split()
+
+def skewed(n, s=1.1):
+    """Zipf-like weights: the first few of n users get most of the work."""
+    return [1 / (i + 1) ** s for i in range(n)]
+
+def generate(path, users=1000, tasks=500000, seed=1, batch=10000, days=730):
+    os.environ["DAILY_WORK_DB"] = path
+    import web_app   # brings the schema up to date on import
+    rnd = random.Random(seed)
+
+    c = web_app.connect()
+    people = []
+    for role, share in ROLES:
+        for i in range(max(1, round(users * share))):
+            u = f"{role[:3]}{i:04d}"
+            people.append((u, web_app.hash_pw(u), role, f"{role.title()} {i}"))
+    c.executemany("INSERT OR IGNORE INTO users(username,password_hash,role,name) VALUES (?,?,?,?)", people)
+    c.commit()
+
+    ids = {}
+    for role, _ in ROLES:
+        ids[role] = [r[0] for r in c.execute("SELECT id FROM users WHERE role=? AND username IS NOT NULL", (role,))]
+        rnd.shuffle(ids[role])
+    weights = {role: skewed(len(v)) for role, v in ids.items()}
+
+    def pick(options):
+        return rnd.choices([o for o, _ in options], [w for _, w in options])[0]
+
+    now = datetime.now()
+    start = now - timedelta(days=days)
+    step = days * 86400 / max(tasks, 1)
+    rows = []
+    t0 = time.perf_counter()
+    for n in range(tasks):
+        status = pick(STATUS)
+        created = start + timedelta(seconds=n * step + rnd.random() * step)
+        # the newest tasks were created hours ago; don't update them in the future
+        updated = min(created + timedelta(hours=rnd.random() * 72), now) if status != "Pending" else created
+        tech = None if status == "Pending" else rnd.choices(ids["technician"], weights["technician"])[0]
+        progress = 100 if status == "Completed" else (rnd.randint(5, 95) if status == "Running" else 0)
+        rows.append((
+            f"{pick(MODEL)} {' '.join(rnd.sample(WORDS, 3))} {n}",
+            pick(MODEL), pick(URGENCY),
+            rnd.choices(ids["engineer"], weights["engineer"])[0],
+            rnd.choices(ids["officer"], weights["officer"])[0],
+            tech, status, progress,
+            created.isoformat(" ", "seconds"), updated.isoformat(" ", "seconds"),
+        ))
+        if len(rows) >= batch or n == tasks - 1:
+            c.executemany("""
+            INSERT INTO tasks(title,model,urgency,engineer_id,officer_id,technician_id,status,progress,created_at,updated_at)
+            VALUES (?,?,?,?,?,?,?,?,?,?)""", rows)
+            c.commit()
+            rows.clear()
+            print(f"\r{n + 1}/{tasks} tasks", end="", file=sys.stderr)
+    print(f"\r{tasks} tasks, {len(people)} users in {time.perf_counter() - t0:.0f}s", file=sys.stderr)
+    c.close()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m bench.generate", description=__doc__.splitlines()[0])
+    ap.add_argument("db", help="database file to create")
+    ap.add_argument("--users", type=int, default=1000)
+    ap.add_argument("--tasks", type=int, default=500000)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--force", action="store_true", help="overwrite an existing file")
+    a = ap.parse_args(argv)
+    if os.path.exists(a.db):
+        if not a.force:
+            ap.error(f"{a.db} exists (use --force to overwrite)")
+        for ext in ("", "-wal", "-shm"):
+            if os.path.exists(a.db + ext):
+                os.remove(a.db + ext)
+    generate(a.db, a.users, a.tasks, a.seed)
+
+if __name__ == "__main__":
+    main()
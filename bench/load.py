@@ -0,0 +1,245 @@
+"""Replay a shift's worth of traffic against a running server.
+
+    python -m bench.load bench.db --rate 50 --duration 60 --users 50
+
+Logs in as --users synthetic users of each role (made by bench.generate)
+and sends a weighted mix of dashboard reads and assign_tech, update_status
+and update_progress writes at a fixed rate. The rate doesn't slow down
+when the server does, so latency is measured from when each request was
+due, not from when a free thread got round to sending it.
+
+Without --url a gunicorn server (or Flask's threaded server, with
+--server flask) is started on the database and stopped afterwards. A 503
+from the server is a write that gave up waiting for the SQLite lock; those
+are counted apart from other errors.
+"""
+import argparse, http.client, json, os, queue, random, socket, subprocess, sys, threading, time
+from urllib.parse import urlencode, urlsplit
+import sqlite3
+
+from bench.run import stats
+
+# (name, role, weight): a shift end, technicians closing out their work
+MIX = (
+    ("dashboard", "technician", 35),
+    ("dashboard", "officer", 20),
+    ("dashboard", "engineer", 10),
+    ("dashboard", "admin", 2),
+    ("update_progress", "technician", 23),
+    ("assign_tech", "officer", 5),
+    ("update_status", "officer", 5),
+)
+ROLES = ("admin", "engineer", "officer", "technician")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class Client:
+    """One keep-alive connection per worker thread; the session cookie
+    travels with the request, so any thread can act as any user."""
+
+    def __init__(self, url, timeout=30):
+        u = urlsplit(url)
+        self.host, self.port, self.timeout = u.hostname, u.port or 80, timeout
+        self.local = threading.local()
+
+    def send(self, method, path, cookie=None, form=None):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self.local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        headers = {"Cookie": cookie} if cookie else {}
+        body = None
+        if form is not None:
+            body = urlencode(form)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        try:
+            conn.request(method, path, body, headers)
+            r = conn.getresponse()
+            data = r.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()   # reconnect on the next request
+            raise
+        return r.status, r.getheader("Set-Cookie"), data
+
+def login(client, username):
+    status, cookie, _ = client.send("POST", "/", form={"u": username, "p": username})
+    if status != 302 or not cookie:
+        raise RuntimeError(f"can't log in as {username}; was the database made by bench.generate?")
+    return cookie.split(";", 1)[0]
+
+def pick_users(path, n):
+    """Per role, the n busiest users and the ids of tasks they can act on."""
+    c = sqlite3.connect(path)
+    users = {}
+    for role in ROLES:
+        users[role] = c.execute("""
+        SELECT u.id, u.username FROM users u LEFT JOIN task_status_counts s ON s.user_id=u.id AND s.role=u.role
+        WHERE u.role=? AND u.username GLOB ?
+        GROUP BY u.id ORDER BY SUM(s.n) DESC LIMIT ?""", (role, role[:3] + "[0-9]*", n)).fetchall()
+    tasks = {}
+    for role, col in (("officer", "officer_id"), ("technician", "technician_id")):
+        for uid, _ in users[role]:
+            tasks[uid] = [r[0] for r in c.execute(
+                f"SELECT id FROM tasks WHERE {col}=? AND status!='Completed' ORDER BY id DESC LIMIT 200", (uid,))]
+    c.close()
+    return users, tasks
+
+def request_for(name, uid, tasks, techs, rnd):
+    """(route, method, path, form) for one operation of the mix."""
+    mine = tasks.get(uid)
+    if name == "dashboard" or not mine:
+        return "dashboard", "GET", "/dashboard", None
+    i = rnd.choice(mine)
+    if name == "update_progress":
+        return name, "POST", f"/update_progress/{i}", {"progress": rnd.randint(10, 95)}
+    if name == "assign_tech":
+        return name, "POST", f"/assign_tech/{i}", {"technician": rnd.choice(techs)}
+    return name, "GET", f"/update_status/{i}/{rnd.choice(('Pending', 'Running'))}", None
+
+def drive(client, users, tasks, rate, duration, threads=64, mix=MIX, seed=1):
+    rnd = random.Random(seed)
+    cookies = {uid: login(client, name) for role in ROLES for uid, name in users[role]}
+    techs = [uid for uid, _ in users["technician"]]
+    ops = [(n, r) for n, r, _ in mix if users[r]]
+    weights = [w for n, r, w in mix if users[r]]
+
+    todo = queue.Queue(maxsize=threads * 4)
+    lock = threading.Lock()
+    results = {}   # route -> {"ms": [], "errors": 0, "locked": 0}
+
+    def worker():
+        while True:
+            job = todo.get()
+            if job is None:
+                return
+            due, route, method, path, cookie, form = job
+            try:
+                status, _, body = client.send(method, path, cookie, form)
+                locked = status == 503 and b"locked" in body
+                error = status >= 400 and not locked
+            except (OSError, http.client.HTTPException):
+                error, locked = True, False
+            ms = (time.perf_counter() - due) * 1000
+            with lock:
+                r = results.setdefault(route, {"ms": [], "errors": 0, "locked": 0})
+                r["ms"].append(ms)
+                r["errors"] += error
+                r["locked"] += locked
+
+    pool = [threading.Thread(target=worker, daemon=True) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    start = time.perf_counter()
+    n, lagged = 0, 0
+    while True:
+        due = start + n / rate
+        if due - start >= duration:
+            break
+        wait = due - time.perf_counter()
+        if wait > 0:
+            time.sleep(wait)
+        elif wait < -0.1:
+            lagged += 1
+        name, role = rnd.choices(ops, weights)[0]
+        uid, _ = rnd.choice(users[role])
+        route, method, path, form = request_for(name, uid, tasks, techs, rnd)
+        todo.put((due, route, method, path, cookies[uid], form))
+        n += 1
+    for _ in pool:
+        todo.put(None)
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return {route: {**stats(r["ms"]), "p99_ms": round(percentile(r["ms"], 0.99), 3),
+                    "rps": round(len(r["ms"]) / elapsed, 1), "errors": r["errors"], "locked": r["locked"]}
+            for route, r in sorted(results.items())}, {"sent": n, "seconds": round(elapsed, 1), "lagged": lagged}
+
+def percentile(ms, q):
+    ms = sorted(ms)
+    return ms[min(len(ms) - 1, int(len(ms) * q))]
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(path, kind="gunicorn", workers=4):
+    port = free_port()
+    env = {**os.environ, "DAILY_WORK_DB": os.path.abspath(path)}
+    if kind == "gunicorn":
+        cmd = [sys.executable, "-m", "gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{port}",
+            "--log-level", "warning", "web_app:app"]
+    else:
+        cmd = [sys.executable, "-c", f"import web_app; web_app.app.run('127.0.0.1', {port}, threaded=True)"]
+    proc = subprocess.Popen(cmd, env=env, cwd=ROOT, stdout=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return proc, f"http://127.0.0.1:{port}"
+        except OSError:
+            if proc.poll() is not None:
+                raise RuntimeError(f"server exited with {proc.returncode}")
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("server didn't start listening")
+
+def report(routes, run, out=sys.stdout):
+    print(f"{'route':<18}{'req':>7}{'req/s':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}{'locked':>8}", file=out)
+    for route, r in routes.items():
+        print(f"{route:<18}{r['n']:>7}{r['rps']:>8.1f}{r['median_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+              f"{r['errors']:>8}{r['locked']:>8}", file=out)
+    total = sum(r["n"] for r in routes.values())
+    print(f"{total} requests in {run['seconds']}s ({total / run['seconds']:.1f}/s)"
+          + (f"; driver fell behind on {run['lagged']}" if run["lagged"] else ""), file=out)
+
+def parse_mix(text):
+    """Reweights MIX from "dashboard=60,update_progress:technician=30".
+
+    name=weight gives that operation `weight` in total, split across its
+    roles in MIX's proportions; name:role=weight sets one entry outright.
+    Entries not mentioned keep their MIX weight.
+    """
+    mix = {(n, r): w for n, r, w in MIX}
+    for item in text.split(","):
+        key, _, weight = item.partition("=")
+        name, _, role = key.strip().partition(":")
+        entries = [k for k in mix if k[0] == name and (not role or k[1] == role)]
+        if not entries or not weight:
+            raise argparse.ArgumentTypeError(f"unknown mix entry {item!r}")
+        total = sum(mix[k] for k in entries)
+        for k in entries:
+            mix[k] = float(weight) * (mix[k] / total if total else 1 / len(entries))
+    return tuple((n, r, w) for (n, r), w in mix.items())
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m bench.load", description=__doc__.splitlines()[0])
+    ap.add_argument("db", help="database made by bench.generate")
+    ap.add_argument("--url", help="server to hit; default starts one on db")
+    ap.add_argument("--server", choices=("gunicorn", "flask"), default="gunicorn")
+    ap.add_argument("--workers", type=int, default=4, help="gunicorn workers")
+    ap.add_argument("--rate", type=float, default=50, help="requests per second")
+    ap.add_argument("--duration", type=float, default=30, help="seconds")
+    ap.add_argument("--users", type=int, default=50, help="users per role")
+    ap.add_argument("--threads", type=int, default=64, help="client threads")
+    ap.add_argument("--mix", type=parse_mix, default=MIX,
+                    help="reweight operations: name=weight splits across roles as in the default mix, "
+                         "name:role=weight sets one, e.g. dashboard=60,update_progress:technician=30 "
+                         "(default: " + ", ".join(f"{n}:{r}={w}" for n, r, w in MIX) + ")")
+    ap.add_argument("-o", "--out", help="write results as JSON")
+    a = ap.parse_args(argv)
+    if not os.path.exists(a.db):
+        ap.error(f"{a.db} not found (make one with python -m bench.generate)")
+    users, tasks = pick_users(a.db, a.users)
+    proc, url = (None, a.url) if a.url else start_server(a.db, a.server, a.workers)
+    try:
+        routes, run = drive(Client(url), users, tasks, a.rate, a.duration, a.threads, a.mix)
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+    report(routes, run)
+    if a.out:
+        with open(a.out, "w", encoding="utf-8") as f:
+            json.dump({"rate": a.rate, "users_per_role": a.users, "run": run, "routes": routes}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Timed scenarios against a generated database.
+
+    python -m bench.run bench.db -o new.json [--baseline old.json --threshold 0.2]
+
+Web scenarios go through the Flask test client (routing, SQL and template
+rendering, no network); desktop scenarios call the query functions each
+panel's load() runs, without opening a window. Dashboards are timed for the
+busiest user of each role, since that's the page that gets slow first.
+"""
+import argparse, json, os, platform, sqlite3, statistics, subprocess, sys, time
+from datetime import datetime
+
+from bench import compare
+
+def timed(fn, n, warmup=3):
+    for _ in range(warmup):
+        fn()
+    ms = []
+    for _ in range(n):
+        t = time.perf_counter()
+        fn()
+        ms.append((time.perf_counter() - t) * 1000)
+    return ms
+
+def stats(ms):
+    ms = sorted(ms)
+    return {
+        "n": len(ms),
+        "min_ms": round(ms[0], 3),
+        "median_ms": round(statistics.median(ms), 3),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+        "mean_ms": round(statistics.fmean(ms), 3),
+    }
+
+def busiest(c, role):
+    """(id, username) of the user of role with the most tasks."""
+    return c.execute("""
+    SELECT u.id, u.username FROM users u JOIN task_status_counts s ON s.user_id=u.id AND s.role=u.role
+    WHERE u.role=? AND u.username IS NOT NULL GROUP BY u.id ORDER BY SUM(s.n) DESC LIMIT 1""", (role,)).fetchone()
+
+def web_scenarios(web_app, users):
+    app = web_app.app
+    clients = {}
+    for role, (uid, name) in users.items():
+        clients[role] = app.test_client()
+        if clients[role].post("/", data={"u": name, "p": name}).status_code != 302:
+            raise RuntimeError(f"can't log in as {name}; was the database made by bench.generate?")
+
+    def get(role, url):
+        def run():
+            r = clients[role].get(url)
+            if r.status_code != 200:
+                raise RuntimeError(f"{url} as {role}: HTTP {r.status_code}")
+        return run
+
+    def post(role, url, data):
+        # writes redirect on success; a 500 or a 503 lock timeout is quicker
+        # than a real write and would pass for a speedup
+        r = clients[role].post(url, data=data)
+        if r.status_code != 302:
+            raise RuntimeError(f"{url} as {role}: HTTP {r.status_code}")
+
+    anon = app.test_client()
+    name = users["engineer"][1]
+    def login():
+        r = anon.post("/", data={"u": name, "p": name})
+        if r.status_code != 302:
+            raise RuntimeError(f"login: HTTP {r.status_code}")
+
+    officer = users["officer"][0]
+    def add_task():
+        post("engineer", "/add_task", {"title": "bench compressor check", "model": "12K",
+            "urgency": "Regular", "officer": officer})
+
+    tech = users["technician"][0]
+    c = web_app.connect()
+    mine = [r[0] for r in c.execute(
+        "SELECT id FROM tasks WHERE technician_id=? AND status='Running' ORDER BY id DESC LIMIT 50", (tech,))]
+    c.close()
+    step = iter(range(10**9))
+    def update_progress():
+        n = next(step)
+        post("technician", f"/update_progress/{mine[n % len(mine)]}", {"progress": 10 + n % 80})
+
+    yield "web_login", login
+    for role in users:
+        yield f"web_dashboard_{role}", get(role, "/dashboard")
+    yield "web_dashboard_officer_filtered", get("officer", "/dashboard?status=Pending&urgency=Urgent")
+    yield "web_dashboard_admin_search", get("admin", "/dashboard?q=compressor")
+    yield "web_report", get("admin", "/report")
+    yield "web_add_task", add_task
+    if mine:
+        yield "web_update_progress", update_progress
+
+def desktop_scenarios(users):
+    try:
+        import desktop_app as D
+    except ImportError as e:   # no tkinter on this machine
+        print(f"skipping desktop scenarios: {e}", file=sys.stderr)
+        return
+    conn = D.get_db()
+    yield "desktop_engineer_load", lambda: D.engineer_tasks(conn, users["engineer"][0])
+    yield "desktop_officer_load", lambda: D.officer_tasks(conn, users["officer"][0])
+    yield "desktop_technician_load", lambda: D.technician_tasks(conn, users["technician"][0])
+    yield "desktop_admin_load", lambda: D.all_tasks(conn)
+    yield "desktop_admin_search", lambda: D.all_tasks(conn, match="compressor")
+    yield "desktop_report", lambda: D.status_report(conn)
+
+def run(path, n=30, only=None):
+    os.environ["DAILY_WORK_DB"] = path
+    import web_app   # brings the schema up to date on import
+    c = web_app.connect()
+    # roles with no tasks (admin) fall back to a generated user, whose password is known
+    users = {role: busiest(c, role) or c.execute(
+        "SELECT id, username FROM users WHERE role=? AND username IS NOT NULL ORDER BY id DESC LIMIT 1",
+        (role,)).fetchone()
+        for role in ("admin", "engineer", "officer", "technician")}
+    meta = {
+        "when": datetime.now().isoformat(" ", "seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "commit": git_head(),
+        "db_mb": round(os.path.getsize(path) / 2**20, 1),
+        "users": c.execute("SELECT COUNT(*) FROM users").fetchone()[0],
+        "tasks": c.execute("SELECT COUNT(*) FROM tasks").fetchone()[0],
+        "repeat": n,
+    }
+    c.close()
+    results = {}
+    for scenarios in (web_scenarios(web_app, users), desktop_scenarios(users)):
+        for name, fn in scenarios:
+            if only and only not in name:
+                continue
+            results[name] = stats(timed(fn, n))
+            print(f"{name:<32}{results[name]['median_ms']:>10.2f} ms  (p95 {results[name]['p95_ms']:.2f})",
+                file=sys.stderr)
+    return {"meta": meta, "scenarios": results}
+
+def git_head():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m bench.run", description=__doc__.splitlines()[0])
+    ap.add_argument("db", help="database made by bench.generate")
+    ap.add_argument("-o", "--out", help="write results as JSON")
+    ap.add_argument("-n", "--repeat", type=int, default=30, help="timed runs per scenario")
+    ap.add_argument("-k", dest="only", help="only scenarios whose name contains this")
+    ap.add_argument("--baseline", help="earlier results to compare against")
+    ap.add_argument("--threshold", type=float, default=0.2, help="allowed median slowdown (0.2 = 20%%)")
+    a = ap.parse_args(argv)
+    if not os.path.exists(a.db):
+        ap.error(f"{a.db} not found (make one with python -m bench.generate)")
+    result = run(a.db, a.repeat, a.only)
+    if a.out:
+        with open(a.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    if a.baseline:
+        return 1 if compare.report(compare.compare(compare.load(a.baseline), result, a.threshold)) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
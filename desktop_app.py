@@ -1,855 +1,1514 @@
-﻿import tkinter as tk
-from tkinter import ttk, messagebox
-import sqlite3, hashlib, os
-from datetime import datetime
-# ================= UTIL =================
-def wrap_text(text, max_len=35):
-    if not text:
-        return ""
-    words = text.split()
-    lines = []
-    line = ""
-
-    for w in words:
-        if len(line) + len(w) <= max_len:
-            line += w + " "
-        else:
-            lines.append(line.strip())
-            line = w + " "
-
-    lines.append(line.strip())
-    return "\n".join(lines)
-
-
-DB_NAME = "daily_work.db"
-
-# ================= DATABASE =================
-
-def get_db():
-    return sqlite3.connect(DB_NAME)
-
-def hash_password(p):
-    return hashlib.sha256(p.encode()).hexdigest()
-
-def init_db():
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS users(
-        username TEXT PRIMARY KEY,
-        password_hash TEXT,
-        role TEXT,
-        name TEXT
-    )""")
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS tasks(
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        title TEXT,
-        model TEXT,
-        urgency TEXT,
-        engineer TEXT,
-        officer TEXT,
-        technician TEXT,
-        status TEXT,
-        progress INTEGER DEFAULT 0,
-        start_time TEXT,
-        created_at TEXT,
-        updated_at TEXT
-    )""")
-
-    if not cur.execute("SELECT 1 FROM users WHERE username='admin'").fetchone():
-        cur.execute(
-            "INSERT INTO users VALUES (?,?,?,?)",
-            ("admin", hash_password("3624"), "admin", "System Admin")
-        )
-
-    defaults = [
-        ("45213","45213","engineer","Engr. Sadid Hossain - 45213 "),
-        ("41053","41053","engineer","Engr. Enamul Haque - 41053 "),
-        ("38250","38250","officer","Md. Jahid Hasan - 38250 "),
-        ("19359","19359","officer","Papon Chandra Das - 19359 "),
-        ("6810","6810","technician","Selim - 6810"),
-    ]
-
-    for u,p,r,n in defaults:
-        if not cur.execute("SELECT 1 FROM users WHERE username=?", (u,)).fetchone():
-            cur.execute(
-                "INSERT INTO users VALUES (?,?,?,?)",
-                (u, hash_password(p), r, n)
-            )
-
-    conn.commit()
-    conn.close()
-
-# ================= UTIL =================
-
-def safe_icon(win, icon="icon.ico"):
-    try:
-        if os.path.exists(icon):
-            win.iconbitmap(icon)
-    except:
-        pass
-
-def apply_hacker_theme(root):
-    style = ttk.Style(root)
-    style.theme_use("clam")
-    bg="#0b0f14"; fg="#c9d1d9"; neon="#39ff14"; dark="#161b22"
-    root.configure(bg=bg)
-    style.configure(".", background=bg, foreground=fg, fieldbackground=dark)
-    style.configure("TLabel", font=("Consolas",10))
-    style.configure("TButton", foreground=neon, font=("Consolas",10,"bold"))
-    style.configure("Treeview", background=dark, rowheight=32)
-    style.configure("Treeview.Heading", foreground=neon)
-
-def logout(root, login_win):
-    if messagebox.askyesno("Logout","Do you want to logout?"):
-        root.destroy()
-        login_win.deiconify()
-
-# ================= THEME =================
-
-def apply_hacker_theme(root):
-    style = ttk.Style(root)
-    style.theme_use("clam")
-
-    bg="#0b0f14"; fg="#c9d1d9"; neon="#39ff14"; dark="#161b22"
-    root.configure(bg=bg)
-
-    style.configure(".", background=bg, foreground=fg, fieldbackground=dark)
-    style.configure("TLabel", font=("Consolas",10))
-    style.configure("TButton", foreground=neon, font=("Consolas",10,"bold"))
-    style.configure("Glow.TButton", foreground=bg, background=neon)
-    style.configure("Treeview", background=dark, rowheight=34)
-    style.configure("Treeview.Heading", foreground=neon)
-    style.map("Treeview", background=[("selected","#238636")])
-    # ===== ADMIN NOTEBOOK COLOR FIX =====
-    style.configure(
-        "TNotebook",
-        background=bg,
-        borderwidth=0
-    )
-
-    style.configure(
-        "TNotebook.Tab",
-        background=dark,
-        foreground=fg,
-        padding=(14,6),
-        font=("Consolas",10,"bold")
-    )
-
-    style.map(
-        "TNotebook.Tab",
-        background=[
-            ("selected", neon),
-            ("active", "#1f6feb")
-        ],
-        foreground=[
-            ("selected", bg),
-            ("active", "#ffffff")
-        ]
-    )
-
-
-
-def glow(btn):
-    btn.bind("<Enter>", lambda e: btn.configure(style="Glow.TButton"))
-    btn.bind("<Leave>", lambda e: btn.configure(style="TButton"))
-
-
-# ================= LOGOUT =================
-
-def logout(root, login_win):
-    if messagebox.askyesno("Logout","Do you want to logout?"):
-        root.destroy()
-        login_win.deiconify()
-
-
-# ================= ENGINEER PANEL =================
-
-class EngineerPanel(ttk.Frame):
-    def __init__(self, parent, root, login_win, username):
-        super().__init__(parent)
-        self.root = root
-        self.login_win = login_win
-        self.username = username
-
-        conn = get_db(); cur = conn.cursor()
-        cur.execute("SELECT name FROM users WHERE username=?", (username,))
-        self.name = cur.fetchone()[0]
-        conn.close()
-
-        self.editing_task_id = None
-
-        self.pack(fill="both", expand=True)
-        self.ui()
-
-    def ui(self):
-        # -------- TOP BAR --------
-        top = ttk.Frame(self)
-        top.pack(fill="x", padx=10)
-
-        ttk.Label(
-            top,
-            text=f"ENGINEER PANEL – {self.name} ({self.username})",
-            font=("Consolas", 14, "bold"),
-            foreground="#39ff14"
-        ).pack(side="left")
-
-        b = ttk.Button(
-            top, text="LOGOUT",
-            command=lambda: logout(self.root, self.login_win)
-        )
-        b.pack(side="right")
-        glow(b)
-
-        # -------- TASK ENTRY --------
-        entry = ttk.LabelFrame(self, text="Add / Edit Task", padding=10)
-        entry.pack(fill="x", padx=10, pady=10)
-
-        self.title = ttk.Entry(entry, width=35)
-        self.model = ttk.Combobox(
-            entry,
-            values=["12K", "18K", "24K", "30K", "Portable"],
-            state="readonly",
-            width=15
-        )
-        self.urgency = ttk.Combobox(
-            entry,
-            values=["Regular", "Urgent", "Most Urgent"],
-            state="readonly",
-            width=14
-        )
-        self.officer = ttk.Combobox(
-            entry,
-            values=["Md. Jahid Hasan", "Papon Chandra Das"],
-            state="readonly",
-            width=20
-        )
-
-        fields = [
-            ("Task", self.title),
-            ("Model", self.model),
-            ("Urgency", self.urgency),
-            ("Officer", self.officer)
-        ]
-
-        for i, (l, w) in enumerate(fields):
-            ttk.Label(entry, text=l).grid(row=0, column=i * 2)
-            w.grid(row=0, column=i * 2 + 1, padx=4)
-
-        self.add_btn = ttk.Button(entry, text="ADD TASK", command=self.add_or_update_task)
-        self.add_btn.grid(row=0, column=8, padx=10)
-        glow(self.add_btn)
-
-        # -------- TASK LIST --------
-        self.tree = ttk.Treeview(
-            self,
-            columns=("id", "details", "model", "urgency", "officer", "status", "time"),
-            show="headings"
-        )
-
-        heads = ["ID", "TASK DETAILS", "MODEL", "URGENCY", "OFFICER", "STATUS", "TIME"]
-        for i, c in enumerate(self.tree["columns"]):
-            self.tree.heading(c, text=heads[i], anchor="center")
-            self.tree.column(c, width=70, anchor="center")
-
-        self.tree.column("details", width=350)
-        self.tree.pack(fill="both", expand=True, padx=10, pady=10)
-
-        # -------- EDIT BUTTON --------
-        btn_frame = ttk.Frame(self)
-        btn_frame.pack(pady=5)
-
-        edit_btn = ttk.Button(btn_frame, text="EDIT TASK", command=self.load_for_edit)
-        edit_btn.pack()
-        glow(edit_btn)
-
-        self.load()
-
-    # -------- ADD / UPDATE TASK --------
-    def add_or_update_task(self):
-        if not all([
-            self.title.get(),
-            self.model.get(),
-            self.urgency.get(),
-            self.officer.get()
-        ]):
-            messagebox.showwarning("Missing", "Fill all fields")
-            return
-
-        now = datetime.now().strftime('%d-%b-%Y %I:%M %p')
-        conn = get_db(); cur = conn.cursor()
-
-        if self.editing_task_id:
-            cur.execute("""
-                UPDATE tasks SET
-                title=?, model=?, urgency=?, officer=?, updated_at=?
-                WHERE id=?
-            """, (
-                self.title.get(),
-                self.model.get(),
-                self.urgency.get(),
-                self.officer.get(),
-                now,
-                self.editing_task_id
-            ))
-            self.editing_task_id = None
-            self.add_btn.config(text="ADD TASK")
-            messagebox.showinfo("Updated", "Task updated successfully")
-        else:
-            cur.execute("""
-                INSERT INTO tasks
-                (title, model, urgency, engineer, officer, status, created_at, updated_at)
-                VALUES (?,?,?,?,?,?,?,?)
-            """, (
-                self.title.get(),
-                self.model.get(),
-                self.urgency.get(),
-                self.name,
-                self.officer.get(),
-                "Pending",
-                now,
-                now
-            ))
-
-        conn.commit(); conn.close()
-        self.clear_fields()
-        self.load()
-
-    # -------- LOAD TASK FOR EDIT --------
-    def load_for_edit(self):
-        selected = self.tree.focus()
-        if not selected:
-            messagebox.showwarning("Select Task", "Select a task to edit")
-            return
-
-        values = self.tree.item(selected, "values")
-        self.editing_task_id = values[0]
-
-        self.title.delete(0, "end")
-        self.title.insert(0, values[1])
-        self.model.set(values[2])
-        self.urgency.set(values[3])
-        self.officer.set(values[4])
-
-        self.add_btn.config(text="UPDATE TASK")
-
-    # -------- LOAD TASK LIST --------
-    def load(self):
-        self.tree.delete(*self.tree.get_children())
-        conn = get_db(); cur = conn.cursor()
-        cur.execute("""
-            SELECT id, title, model, urgency, officer, status, updated_at
-            FROM tasks WHERE engineer=?
-        """, (self.name,))
-        for r in cur.fetchall():
-            self.tree.insert(
-                "",
-                "end",
-                values=(r[0], wrap_text(r[1]), r[2], r[3], r[4], r[5], r[6])
-            )
-        conn.close()
-
-    def clear_fields(self):
-        self.title.delete(0, "end")
-        self.model.set("")
-        self.urgency.set("")
-        self.officer.set("")
-# ================= TECHNICIAN PANEL =================
-
-class TechnicianPanel(ttk.Frame):
-    def __init__(self,parent,root,login_win,username):
-        super().__init__(parent)
-        self.root=root
-        self.login_win=login_win
-        self.username=username
-
-        conn=get_db();cur=conn.cursor()
-        cur.execute("SELECT name FROM users WHERE username=?", (username,))
-        self.name=cur.fetchone()[0]
-        conn.close()
-
-        self.pack(fill="both",expand=True)
-        self.ui()
-
-    def ui(self):
-        top=ttk.Frame(self); top.pack(fill="x",padx=10)
-        ttk.Label(top,text=f"TECHNICIAN PANEL – {self.name}",
-                  font=("Consolas",14,"bold"),foreground="#39ff14").pack(side="left")
-        ttk.Button(top,text="LOGOUT",
-                   command=lambda:logout(self.root,self.login_win)).pack(side="right")
-
-        self.tree=ttk.Treeview(
-            self,
-            columns=("id","title","engineer","status","progress"),
-            show="headings"
-        )
-        for c in self.tree["columns"]:
-            self.tree.heading(c,text=c.upper())
-            self.tree.column(c,width=180)
-        self.tree.pack(fill="both",expand=True,padx=10,pady=10)
-
-        self.scale=ttk.Scale(self,from_=0,to=100,orient="horizontal")
-        self.scale.pack(pady=5)
-
-        ttk.Button(self,text="UPDATE PROGRESS",
-                   command=self.update_progress).pack()
-
-        self.load()
-
-    def load(self):
-        self.tree.delete(*self.tree.get_children())
-        conn=get_db();cur=conn.cursor()
-        cur.execute("""
-            SELECT id,title,engineer,status,progress
-            FROM tasks WHERE technician=?
-        """,(self.name,))
-        for r in cur.fetchall():
-            self.tree.insert("", "end", values=r)
-        conn.close()
-
-    def update_progress(self):
-        sel=self.tree.selection()
-        if not sel: return
-        tid=self.tree.item(sel[0])["values"][0]
-        p=int(self.scale.get())
-        conn=get_db();cur=conn.cursor()
-        cur.execute(
-            "UPDATE tasks SET progress=?,status=? WHERE id=?",
-            (p,"Completed" if p==100 else "Running",tid)
-        )
-        conn.commit();conn.close()
-        self.load()
-
-
-# ================= OFFICER PANEL =================
-
-class OfficerPanel(ttk.Frame):
-    def __init__(self, parent, root, login_win, username):
-        super().__init__(parent)
-        self.root = root
-        self.login_win = login_win
-        self.username = username
-
-        conn = get_db()
-        cur = conn.cursor()
-        cur.execute("SELECT name FROM users WHERE username=?", (username,))
-        self.name = cur.fetchone()[0]
-        conn.close()
-
-        self.pack(fill="both", expand=True)
-        self.ui()
-        self.auto_refresh()   # 🔥 live refresh
-
-    # ---------------- UI ----------------
-    def ui(self):
-        # ---- TOP BAR ----
-        top = ttk.Frame(self)
-        top.pack(fill="x", padx=10, pady=10)
-
-        ttk.Label(
-            top,
-            text=f"OFFICER PANEL – {self.name}",
-            font=("Consolas", 16, "bold"),
-            foreground="#39ff14"
-        ).pack(side="left")
-
-        ttk.Button(
-            top,
-            text="Logout",
-            command=self.logout
-        ).pack(side="right", padx=5)
-
-        # ---- TASK LIST ----
-        self.tree = ttk.Treeview(
-            self,
-            columns=(
-                "id", "task", "engineer", "technician",
-                "status", "progress", "updated"
-            ),
-            show="headings"
-        )
-
-        headings = [
-            "ID", "TASK", "ENGINEER",
-            "TECHNICIAN", "STATUS", "PROGRESS %", "UPDATED"
-        ]
-
-        for col, head in zip(self.tree["columns"], headings):
-            self.tree.heading(col, text=head, anchor="center")
-            self.tree.column(col, width=140, anchor="center")
-
-        self.tree.column("task", width=360)
-
-        self.tree.pack(fill="both", expand=True, padx=10, pady=10)
-
-        # ---- ACTION BUTTONS ----
-        btns = ttk.Frame(self)
-        btns.pack(pady=8)
-
-        ttk.Button(
-            btns,
-            text="Assign Technician",
-            command=self.assign_popup
-        ).pack(side="left", padx=5)
-
-        ttk.Button(
-            btns,
-            text="Set Running",
-            command=lambda: self.update_status("Running")
-        ).pack(side="left", padx=5)
-
-        ttk.Button(
-            btns,
-            text="Set Completed",
-            command=lambda: self.update_status("Completed")
-        ).pack(side="left", padx=5)
-
-        self.load()
-
-    # ---------------- LOAD TASKS ----------------
-    def load(self):
-        self.tree.delete(*self.tree.get_children())
-
-        conn = get_db()
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT id, title, engineer,
-                   IFNULL(technician,'-'),
-                   status,
-                   IFNULL(progress,0),
-                   updated_at
-            FROM tasks
-            WHERE officer=?
-        """, (self.name,))
-
-        for r in cur.fetchall():
-            self.tree.insert("", "end", values=r)
-
-        conn.close()
-
-    # ---------------- AUTO REFRESH ----------------
-    def auto_refresh(self):
-        try:
-            self.load()
-        except:
-            return
-        self.after(3000, self.auto_refresh)   # 🔁 every 3 sec
-
-    # ---------------- UPDATE STATUS ----------------
-    def update_status(self, status):
-        sel = self.tree.selection()
-        if not sel:
-            messagebox.showwarning("Select", "Select a task")
-            return
-
-        tid = self.tree.item(sel[0])["values"][0]
-        now = datetime.now().strftime('%d-%b-%Y %I:%M %p')
-
-        conn = get_db()
-        cur = conn.cursor()
-        cur.execute(
-            "UPDATE tasks SET status=?, updated_at=? WHERE id=?",
-            (status, now, tid)
-        )
-        conn.commit()
-        conn.close()
-        self.load()
-
-    # ---------------- ASSIGN TECHNICIAN ----------------
-    def assign_popup(self):
-        sel = self.tree.selection()
-        if not sel:
-            messagebox.showwarning("Select", "Select a task")
-            return
-
-        tid = self.tree.item(sel[0])["values"][0]
-
-        win = tk.Toplevel(self)
-        win.title("Assign Technician")
-        win.geometry("300x200")
-        apply_hacker_theme(win)
-
-        ttk.Label(
-            win,
-            text="Select Technician",
-            font=("Consolas", 12, "bold"),
-            foreground="#39ff14"
-        ).pack(pady=10)
-
-        tech = ttk.Combobox(win, state="readonly", width=26)
-        tech.pack(pady=10)
-
-        conn = get_db()
-        cur = conn.cursor()
-        cur.execute("SELECT name FROM users WHERE role='technician'")
-        tech["values"] = [r[0] for r in cur.fetchall()]
-        conn.close()
-
-        def assign():
-            if not tech.get():
-                return
-            conn = get_db()
-            cur = conn.cursor()
-            cur.execute(
-                "UPDATE tasks SET technician=? WHERE id=?",
-                (tech.get(), tid)
-            )
-            conn.commit()
-            conn.close()
-            win.destroy()
-            self.load()
-
-        ttk.Button(win, text="ASSIGN", command=assign).pack(pady=15)
-
-    # ---------------- LOGOUT ----------------
-    def logout(self):
-        if messagebox.askyesno("Logout", "Do you want to logout?"):
-            self.root.destroy()
-            self.login_win.deiconify()
-
-
-
-# ================= ADMIN PANEL =================
-
-class AdminPanel(ttk.Frame):
-    def __init__(self,parent,root,login_win):
-        super().__init__(parent)
-        self.root=root
-        self.login_win=login_win
-        self.pack(fill="both",expand=True)
-        self.ui()
-
-    def ui(self):
-        top=ttk.Frame(self); top.pack(fill="x",padx=10)
-        ttk.Label(
-            top,
-            text="ADMIN DASHBOARD",
-            font=("Consolas",15,"bold"),
-            foreground="#39ff14"
-        ).pack(side="left")
-
-        b=ttk.Button(
-            top,
-            text="LOGOUT",
-            command=lambda:logout(self.root,self.login_win)
-        )
-        b.pack(side="right")
-        glow(b)
-
-        nb=ttk.Notebook(self)
-        nb.pack(fill="both",expand=True)
-
-        self.users_frame=ttk.Frame(nb)
-        self.tasks_frame=ttk.Frame(nb)
-        self.report_frame=ttk.Frame(nb)
-
-        nb.add(self.users_frame,text="👤 USERS")
-        nb.add(self.tasks_frame,text="📝 TASKS")
-        nb.add(self.report_frame,text="📊 REPORT")
-
-        self.users_tab()
-        self.tasks_tab()
-        self.report_tab()
-
-    # ---------- USERS TAB ----------
-    def users_tab(self):
-        f=self.users_frame
-
-        top=ttk.LabelFrame(f,text="Create User",padding=10)
-        top.pack(fill="x",padx=10,pady=5)
-
-        name=ttk.Entry(top,width=18)
-        username=ttk.Entry(top,width=14)
-        password=ttk.Entry(top,width=14,show="*")
-
-        # ✅ Technician role added here
-        role=ttk.Combobox(
-            top,
-            values=["admin","engineer","officer","technician"],
-            state="readonly",
-            width=14
-        )
-
-        fields=[
-            ("Name",name),
-            ("Username",username),
-            ("Password",password),
-            ("Role",role)
-        ]
-
-        for i,(l,w) in enumerate(fields):
-            ttk.Label(top,text=l).grid(row=0,column=i*2)
-            w.grid(row=0,column=i*2+1,padx=4)
-
-        def create_user():
-            if not all([name.get(),username.get(),password.get(),role.get()]):
-                messagebox.showwarning("Missing","Fill all fields")
-                return
-
-            conn=get_db();cur=conn.cursor()
-            cur.execute(
-                "INSERT INTO users VALUES (?,?,?,?)",
-                (
-                    username.get(),
-                    hash_password(password.get()),
-                    role.get(),
-                    name.get()
-                )
-            )
-            conn.commit();conn.close()
-            self.load_users()
-
-        b=ttk.Button(top,text="CREATE",command=create_user)
-        b.grid(row=0,column=8,padx=10)
-        glow(b)
-
-        self.tv=ttk.Treeview(
-            f,
-            columns=("name","username","role"),
-            show="headings"
-        )
-
-        for c in self.tv["columns"]:
-            self.tv.heading(c,text=c.upper(),anchor="center")
-            self.tv.column(c,width=200,anchor="center")
-
-        self.tv.pack(fill="both",expand=True,padx=10,pady=10)
-
-        d=ttk.Button(
-            f,
-            text="DELETE SELECTED USER",
-            command=self.delete_user
-        )
-        d.pack(pady=5)
-        glow(d)
-
-        self.load_users()
-
-    def load_users(self):
-        self.tv.delete(*self.tv.get_children())
-        conn=get_db();cur=conn.cursor()
-        cur.execute("SELECT name,username,role FROM users")
-        for r in cur.fetchall():
-            self.tv.insert("", "end", values=r)
-        conn.close()
-
-    def delete_user(self):
-        sel=self.tv.selection()
-        if not sel: return
-        uname=self.tv.item(sel[0])["values"][1]
-        if uname=="admin": return
-
-        conn=get_db();cur=conn.cursor()
-        cur.execute("DELETE FROM users WHERE username=?", (uname,))
-        conn.commit();conn.close()
-        self.load_users()
-
-    # ---------- TASKS TAB ----------
-    def tasks_tab(self):
-        tv=ttk.Treeview(
-            self.tasks_frame,
-            columns=("id","title","model","urgency","engineer","officer","status","time"),
-            show="headings"
-        )
-
-        for c in tv["columns"]:
-            tv.heading(c,text=c.upper(),anchor="center")
-            tv.column(c,width=120,anchor="center")
-
-        tv.pack(fill="both",expand=True,padx=10,pady=10)
-
-        conn=get_db();cur=conn.cursor()
-        cur.execute("""
-            SELECT id,title,model,urgency,engineer,officer,status,updated_at
-            FROM tasks
-        """)
-        for r in cur.fetchall():
-            tv.insert("", "end", values=r)
-        conn.close()
-
-    # ---------- REPORT TAB ----------
-    def report_tab(self):
-        tv=ttk.Treeview(
-            self.report_frame,
-            columns=("engineer","pending","running","completed"),
-            show="headings"
-        )
-
-        for c in tv["columns"]:
-            tv.heading(c,text=c.upper(),anchor="center")
-            tv.column(c,width=180,anchor="center")
-
-        tv.pack(fill="both",expand=True,padx=10,pady=10)
-
-        conn=get_db();cur=conn.cursor()
-        cur.execute("""
-            SELECT engineer,
-            SUM(status='Pending'),
-            SUM(status='Running'),
-            SUM(status='Completed')
-            FROM tasks
-            GROUP BY engineer
-        """)
-        for r in cur.fetchall():
-            tv.insert("", "end", values=r)
-        conn.close()
-
-
-# ================= LOGIN =================
-
-class Login(tk.Tk):
-    def __init__(self):
-        super().__init__()
-        self.title("Login")
-        self.geometry("360x260")
-        apply_hacker_theme(self)
-
-        f=ttk.Frame(self,padding=20); f.pack(fill="both",expand=True)
-        ttk.Label(f,text="DAILY WORK UPDATE",
-                  font=("Consolas",14,"bold"),
-                  foreground="#39ff14").pack(pady=10)
-
-        ttk.Label(f,text="User ID").pack(anchor="w")
-        self.u=ttk.Entry(f); self.u.pack(fill="x")
-        ttk.Label(f,text="Password").pack(anchor="w",pady=(10,0))
-        self.p=ttk.Entry(f,show="*"); self.p.pack(fill="x")
-
-        ttk.Button(f,text="LOGIN",command=self.login).pack(pady=15)
-
-    def login(self):
-        conn=get_db();cur=conn.cursor()
-        cur.execute(
-            "SELECT role FROM users WHERE username=? AND password_hash=?",
-            (self.u.get(), hash_password(self.p.get()))
-        )
-        r=cur.fetchone()
-        conn.close()
-        if not r:
-            messagebox.showerror("Error","Invalid Login")
-            return
-
-        self.withdraw()
-        self.dashboard=tk.Toplevel(self)
-        self.dashboard.geometry("1200x600")
-        apply_hacker_theme(self.dashboard)
-
-        role=r[0]; user=self.u.get()
-
-        if role=="admin":
-            AdminPanel(self.dashboard,self.dashboard,self)
-        elif role=="engineer":
-            EngineerPanel(self.dashboard,self.dashboard,self,user)
-        elif role=="officer":
-            OfficerPanel(self.dashboard,self.dashboard,self,user)
-        elif role=="technician":
-            TechnicianPanel(self.dashboard,self.dashboard,self,user)
-
-# ================= MAIN =================
-
-if __name__=="__main__":
-    init_db()
-    Login().mainloop()
-
+﻿import tkinter as tk
+from tkinter import ttk, messagebox
+import sqlite3, hashlib, os, sys, time, queue, threading, csv, json, argparse, bisect, traceback
+from datetime import datetime
+import slow_query
+from schema import create_schema, fts_query, log_changes, task_history, EXPORT_FIELDS, export_query
+# ================= UTIL =================
+def wrap_text(text, max_len=35):
+    if not text:
+        return ""
+    words = text.split()
+    lines = []
+    line = ""
+
+    for w in words:
+        if len(line) + len(w) <= max_len:
+            line += w + " "
+        else:
+            lines.append(line.strip())
+            line = w + " "
+
+    lines.append(line.strip())
+    return "\n".join(lines)
+
+
+DB_NAME = os.environ.get("DAILY_WORK_DB", "daily_work.db")
+
+# ================= DATABASE =================
+
+# SLOW_QUERY_MS turns on the slow-query log (see slow_query.py); each entry
+# names the query functions that ran the statement.
+class SlowQueryCursor(slow_query.TracedCursor):
+    def caller(self):
+        # the query functions in this file that ran it, innermost first
+        here = os.path.abspath(__file__)
+        names = [f.name for f in traceback.extract_stack(sys._getframe(1))
+                 if os.path.abspath(f.filename) == here and not f.name.startswith("<")]
+        return " < ".join(reversed(names[-3:])) or super().caller()
+
+
+class SlowQueryConnection(slow_query.TracedConnection):
+    cursor_class = SlowQueryCursor
+
+
+def get_db():
+    factory = SlowQueryConnection if slow_query.SLOW_QUERY_MS is not None else sqlite3.Connection
+    conn = sqlite3.connect(DB_NAME, factory=factory)
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+def hash_password(p):
+    return hashlib.sha256(p.encode()).hexdigest()
+
+# Timestamps are stored as local ISO-8601 so SQL can sort and range-query
+# them; the display format is applied only when a row is shown.
+DISPLAY_TIME = "%d-%b-%Y %I:%M %p"
+
+def timestamp():
+    return datetime.now().isoformat(" ", "seconds")
+
+def fmt_time(ts):
+    try:
+        return datetime.fromisoformat(ts).strftime(DISPLAY_TIME)
+    except (TypeError, ValueError):
+        return ts or ""
+
+def init_db():
+    conn = get_db()
+    create_schema(conn)
+    cur = conn.cursor()
+
+    if not cur.execute("SELECT 1 FROM users WHERE username='admin'").fetchone():
+        cur.execute(
+            "INSERT INTO users(username, password_hash, role, name) VALUES (?,?,?,?)",
+            ("admin", hash_password("3624"), "admin", "System Admin")
+        )
+
+    defaults = [
+        ("45213","45213","engineer","Engr. Sadid Hossain"),
+        ("41053","41053","engineer","Engr. Enamul Haque"),
+        ("38250","38250","officer","Md. Jahid Hasan"),
+        ("19359","19359","officer","Papon Chandra Das"),
+        ("6810","6810","technician","Selim"),
+    ]
+
+    for u,p,r,n in defaults:
+        if not cur.execute("SELECT 1 FROM users WHERE username=?", (u,)).fetchone():
+            cur.execute(
+                "INSERT INTO users(username, password_hash, role, name) VALUES (?,?,?,?)",
+                (u, hash_password(p), r, n)
+            )
+
+    conn.commit()
+    conn.close()
+
+# ================= ROSTER CACHE =================
+# (id, name, username) of active users per role for the officer/technician
+# pickers, which keep the ids in a list alongside their entries (names
+# aren't unique).
+# AdminPanel clears it on create/delete; edits made from other stations
+# show up within ROSTER_TTL seconds.
+ROSTER_TTL = 60
+_roster = {}
+
+def roster(conn, role):
+    hit = _roster.get(role)
+    if hit and hit[0] > time.monotonic():
+        return hit[1]
+    rows = conn.execute(
+        "SELECT id, name, username FROM users WHERE role=? AND username IS NOT NULL ORDER BY id",
+        (role,)
+    ).fetchall()
+    _roster[role] = (time.monotonic() + ROSTER_TTL, rows)
+    return rows
+
+def invalidate_roster():
+    _roster.clear()
+
+def roster_label(name, username):
+    return f"{name} ({username})"
+
+# ================= QUERIES =================
+# Everything the panels read or write. Each takes the connection as its
+# first argument so it can run on the DBWorker thread.
+
+def authenticate(conn, username, password):
+    return conn.execute(
+        "SELECT id, role, name FROM users WHERE username=? AND password_hash=?",
+        (username, hash_password(password))
+    ).fetchone()
+
+# task lists are read newest first, a page at a time: `before` is the id of
+# the oldest row already shown (keyset paging, so deep pages stay cheap)
+PAGE_SIZE = 200
+MAX_ID = 2**63 - 1
+
+# bm25 scores every hit; past this many (a word most titles share) the
+# newest matches are shown instead, read off the index in rowid order
+RANK_MAX = 5000
+
+def task_rows(conn, select, where, args, before, limit, match, filters):
+    # `select` has an {fts} slot right after "FROM tasks t"; with search
+    # text the rows come from tasks_fts, best rank first, else newest first.
+    # `filters` ({"status": "Pending", ...}) narrow either one in SQL
+    conds = [where] if where else []
+    if filters:
+        conds += [f"t.{f}=?" for f in filters]
+        args = (*args, *filters.values())
+    if match:
+        m = fts_query(match)
+        hits = conn.execute(
+            "SELECT count(*) FROM (SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ? LIMIT ?)",
+            (m, RANK_MAX + 1)
+        ).fetchone()[0]
+        select = select.format(fts=" JOIN tasks_fts f ON f.rowid=t.id")
+        conds.append("tasks_fts MATCH ?")
+        args = (*args, m)
+        order = "f.rank" if hits <= RANK_MAX else "f.rowid DESC"
+    else:
+        select = select.format(fts="")
+        conds.append("t.id<?")
+        args = (*args, before)
+        order = "t.id DESC"
+    return conn.execute(
+        f"{select} WHERE {' AND '.join(conds)} ORDER BY {order} LIMIT ?",
+        (*args, limit)
+    ).fetchall()
+
+def engineer_tasks(conn, user_id, before=MAX_ID, limit=PAGE_SIZE, match=None, filters=None):
+    return task_rows(conn, """
+        SELECT t.id, t.title, t.model, t.urgency, o.name, t.status, t.updated_at, t.officer_id
+        FROM tasks t{fts} LEFT JOIN users o ON o.id=t.officer_id
+    """, "t.engineer_id=?", (user_id,), before, limit, match, filters)
+
+OFFICER_SELECT = """
+    SELECT t.id, t.title, e.name,
+           IFNULL(x.name,'-'),
+           t.status,
+           IFNULL(t.progress,0),
+           t.updated_at
+    FROM tasks t{fts}
+    LEFT JOIN users e ON e.id=t.engineer_id
+    LEFT JOIN users x ON x.id=t.technician_id
+"""
+
+def officer_tasks(conn, user_id, before=MAX_ID, limit=PAGE_SIZE, match=None, filters=None):
+    return task_rows(conn, OFFICER_SELECT, "t.officer_id=?", (user_id,), before, limit, match, filters)
+
+def technician_tasks(conn, user_id, before=MAX_ID, limit=PAGE_SIZE, match=None, filters=None):
+    return task_rows(conn, """
+        SELECT t.id, t.title, e.name, t.status, t.progress
+        FROM tasks t{fts} LEFT JOIN users e ON e.id=t.engineer_id
+    """, "t.technician_id=?", (user_id,), before, limit, match, filters)
+
+def all_tasks(conn, before=MAX_ID, limit=PAGE_SIZE, match=None, filters=None):
+    return task_rows(conn, """
+        SELECT t.id, t.title, t.model, t.urgency, e.name, o.name, t.status, t.updated_at
+        FROM tasks t{fts}
+        LEFT JOIN users e ON e.id=t.engineer_id
+        LEFT JOIN users o ON o.id=t.officer_id
+    """, None, (), before, limit, match, filters)
+
+# ---------- CHANGES SINCE A VERSION ----------
+def tasks_version(conn):
+    return conn.execute("SELECT value FROM counters WHERE name='tasks'").fetchone()[0]
+
+def task_changes(conn, select, where, args, since, filters=None, limit=500):
+    """What happened to a task list since row version `since`.
+
+    Returns (rows, gone, version, more): rows are the changed tasks that
+    belong in the list (`select` rows, newest first), gone the ids deleted
+    or no longer in it (reassigned, filtered out). Pass `version` back as
+    the next `since`; `more` means there were over `limit` changes and the
+    caller should just reload. Cost follows the number of writes, not the
+    size of the list.
+    """
+    conds = [where, *(f"t.{f}=?" for f in filters or {})]
+    upto = tasks_version(conn)
+    changed = conn.execute(
+        f"SELECT t.id, {' AND '.join(conds)}, t.version FROM tasks t "
+        "WHERE t.version>? AND t.version<=? ORDER BY t.version LIMIT ?",
+        (*args, *(filters or {}).values(), since, upto, limit + 1)
+    ).fetchall()
+    more = len(changed) > limit
+    if more:
+        changed = changed[:limit]
+        upto = changed[-1][2]
+    keep = [i for i, k, _ in changed if k]
+    rows = conn.execute(
+        f"{select.format(fts='')} WHERE t.id IN (SELECT value FROM json_each(?)) ORDER BY t.id DESC",
+        (json.dumps(keep),)
+    ).fetchall() if keep else []
+    gone = [i for i, k, _ in changed if not k]
+    gone += [r[0] for r in conn.execute(
+        "SELECT task_id FROM task_tombstones WHERE version>? AND version<=?", (since, upto))]
+    return rows, gone, upto, more
+
+def officer_changes(conn, user_id, since, filters=None):
+    return task_changes(conn, OFFICER_SELECT, "t.officer_id=?", (user_id,), since, filters)
+
+def status_report(conn):
+    # reads the trigger-maintained counts: one row per user, not per task
+    return conn.execute("""
+        SELECT c.role, c.user_id, u.name,
+        SUM(CASE c.status WHEN 'Pending' THEN c.n ELSE 0 END),
+        SUM(CASE c.status WHEN 'Running' THEN c.n ELSE 0 END),
+        SUM(CASE c.status WHEN 'Completed' THEN c.n ELSE 0 END)
+        FROM task_status_counts c JOIN users u ON u.id=c.user_id
+        GROUP BY c.role, c.user_id HAVING SUM(c.n)>0
+        ORDER BY c.role, u.name
+    """).fetchall()
+
+def list_users(conn):
+    return conn.execute(
+        "SELECT name, username, role FROM users WHERE username IS NOT NULL"
+    ).fetchall()
+
+def save_task(conn, task_id, title, model, urgency, engineer_id, officer_id):
+    now = timestamp()
+    if task_id:
+        log_changes(
+            conn, [task_id], engineer_id, now,
+            title=title, model=model, urgency=urgency, officer_id=officer_id
+        )
+        conn.execute("""
+            UPDATE tasks SET
+            title=?, model=?, urgency=?, officer_id=?, updated_at=?
+            WHERE id=?
+        """, (title, model, urgency, officer_id, now, task_id))
+    else:
+        cur = conn.execute("""
+            INSERT INTO tasks
+            (title, model, urgency, engineer_id, officer_id, status, created_at, updated_at)
+            VALUES (?,?,?,?,?,?,?,?)
+        """, (title, model, urgency, engineer_id, officer_id, "Pending", now, now))
+        conn.execute(
+            "INSERT INTO task_events(task_id, actor_id, field, old, new, at) VALUES (?,?,'status',NULL,'Pending',?)",
+            (cur.lastrowid, engineer_id, now)
+        )
+    conn.commit()
+
+def set_progress(conn, task_id, progress, actor):
+    now = timestamp()
+    status = "Completed" if progress == 100 else "Running"
+    log_changes(conn, [task_id], actor, now, progress=progress, status=status)
+    conn.execute(
+        "UPDATE tasks SET progress=?, status=?, updated_at=? WHERE id=?",
+        (progress, status, now, task_id)
+    )
+    conn.commit()
+
+# officer actions take a list of task ids and apply them in one transaction
+def set_status(conn, task_ids, status, actor):
+    now = timestamp()
+    log_changes(conn, task_ids, actor, now, status=status)
+    conn.executemany(
+        "UPDATE tasks SET status=?, updated_at=? WHERE id=?",
+        [(status, now, task_id) for task_id in task_ids]
+    )
+    conn.commit()
+
+def assign_technician(conn, task_ids, technician_id, actor):
+    now = timestamp()
+    log_changes(conn, task_ids, actor, now, technician_id=technician_id)
+    conn.executemany(
+        "UPDATE tasks SET technician_id=?, updated_at=? WHERE id=?",
+        [(technician_id, now, task_id) for task_id in task_ids]
+    )
+    conn.commit()
+
+def add_user(conn, username, password, role, name):
+    conn.execute(
+        "INSERT INTO users(username, password_hash, role, name) VALUES (?,?,?,?)",
+        (username, hash_password(password), role, name)
+    )
+    conn.commit()
+    invalidate_roster()
+
+def remove_user(conn, username):
+    # tasks keep pointing at the row, so only the login goes away
+    conn.execute(
+        "UPDATE users SET username=NULL, password_hash=NULL WHERE username=?",
+        (username,)
+    )
+    conn.commit()
+    invalidate_roster()
+
+# ================= DB WORKER =================
+
+class DBWorker:
+    """Runs all database work on one background thread.
+
+    submit(fn, *args, done=cb) queues fn(conn, *args) for the worker's own
+    connection. Results come back through a queue that the Tk thread drains
+    every frame with after(), and `done(result)` runs there. If fn raises,
+    `failed(error)` runs instead, or the error is shown in a message box
+    when no `failed` was given. `busy` holds a short status text while jobs
+    are outstanding, for the panels' busy indicator; background polls pass
+    quiet=True so it only shows work the user started.
+    """
+    FRAME_MS = 16
+
+    def __init__(self, root):
+        self.root = root
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.pending = 0
+        self.busy = tk.StringVar(root, value="")
+        threading.Thread(target=self.run, name="db-worker", daemon=True).start()
+        self.root.after(self.FRAME_MS, self.pump)
+
+    def run(self):
+        conn = get_db()
+        while True:
+            fn, args, done, failed, quiet = self.jobs.get()
+            try:
+                result, error = fn(conn, *args), None
+            except Exception as e:
+                if conn.in_transaction:
+                    conn.rollback()
+                result, error = None, e
+            self.results.put((done, failed, result, error, quiet))
+
+    def submit(self, fn, *args, done=None, failed=None, quiet=False):
+        if not quiet:
+            self.pending += 1
+            self.busy.set("⏳ working…")
+        self.jobs.put((fn, args, done, failed, quiet))
+
+    def pump(self):
+        # always reschedule: one bad callback must not stop every result after it
+        try:
+            while True:
+                try:
+                    done, failed, result, error, quiet = self.results.get_nowait()
+                except queue.Empty:
+                    break
+                if not quiet:
+                    self.pending -= 1
+                try:
+                    if error is None:
+                        if done:
+                            done(result)
+                    elif failed:
+                        failed(error)
+                    else:
+                        messagebox.showerror("Database", str(error))
+                except tk.TclError:
+                    pass   # the panel that asked was closed meanwhile
+        finally:
+            if not self.pending:
+                self.busy.set("")
+            self.root.after(self.FRAME_MS, self.pump)
+
+# ================= TREE SYNC =================
+
+class TreeSync:
+    """Keeps a Treeview in step with a query result without rebuilding it.
+
+    update() takes (iid, values) pairs in display order and only inserts,
+    edits, deletes or moves the rows that differ from the previous call, so
+    the selection and scroll position survive a refresh.
+    """
+    def __init__(self, tree):
+        self.tree = tree
+        self.rows = {}
+
+    def update(self, rows):
+        new = {}
+        order = []
+        for iid, values in rows:
+            iid = str(iid)
+            new[iid] = tuple(values)
+            order.append(iid)
+
+        gone = [iid for iid in self.rows if iid not in new]
+        if gone:
+            self.tree.delete(*gone)
+        for iid in order:
+            old = self.rows.get(iid)
+            if old is None:
+                self.tree.insert("", "end", iid=iid, values=new[iid])
+            elif old != new[iid]:
+                self.tree.item(iid, values=new[iid])
+        self.rows = new
+
+        if list(self.tree.get_children()) != order:
+            for i, iid in enumerate(order):
+                self.tree.move(iid, "", i)
+
+    def extend(self, rows):
+        """Appends rows below the ones already shown (the next page)."""
+        for iid, values in rows:
+            iid = str(iid)
+            if iid in self.rows:
+                continue
+            self.rows[iid] = tuple(values)
+            self.tree.insert("", "end", iid=iid, values=self.rows[iid])
+
+    def put(self, iid, values, index):
+        """Edits one row in place, or inserts it at `index` if it's new."""
+        iid, values = str(iid), tuple(values)
+        old = self.rows.get(iid)
+        if old is None:
+            self.tree.insert("", index, iid=iid, values=values)
+        elif old != values:
+            self.tree.item(iid, values=values)
+        self.rows[iid] = values
+
+    def remove(self, iids):
+        gone = [str(i) for i in iids if str(i) in self.rows]
+        if gone:
+            self.tree.delete(*gone)
+            for iid in gone:
+                del self.rows[iid]
+
+# ================= PAGED GRID =================
+
+class PagedGrid:
+    """Shows a task query in a Treeview one page at a time.
+
+    fetch(conn, *args, before, limit) returns rows newest first. The first
+    page is requested straight away and the next one when the user scrolls
+    near the bottom, so opening a panel costs one page of SQL and Tk calls
+    however many tasks exist. Pages go in CHUNK rows per after() tick to
+    keep the window responsive. reload() re-reads the rows already loaded
+    and diffs them in through TreeSync; search() swaps the list for the
+    best full-text matches (one page, no scrolling for more) and filter()
+    narrows it to rows with the given status/urgency/model.
+
+    With changes(conn, *args, since, filters) (see task_changes) refresh()
+    applies only the rows written since the list was read; without it, or
+    while searching, refresh() is a reload().
+    """
+    CHUNK = 50
+
+    def __init__(self, db, tree, scrollbar, fetch, *args, row=lambda r: (r[0], r), changes=None):
+        self.db = db
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.fetch = fetch
+        self.args = args
+        self.row = row
+        self.changes = changes
+        self.version = None     # tasks version the loaded rows are current to
+        self.sync = TreeSync(tree)
+        self.last = MAX_ID      # id of the oldest row loaded so far
+        self.end = False        # the last page has been seen
+        self.loading = False
+        self.gen = 0            # bumped by reload() to drop stale pages
+        self.match = None       # search text, if any
+        self.filters = {}
+
+        scrollbar.configure(command=tree.yview)
+        tree.configure(yscrollcommand=self.scrolled)
+        self.more()
+
+    def scrolled(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(last) > 0.9:
+            self.more()
+
+    def more(self):
+        if self.loading or self.end:
+            return
+        self.loading = True
+        gen = self.gen
+        if self.last == MAX_ID:
+            self.stamp(gen)
+        self.db.submit(
+            self.fetch, *self.args, self.last, PAGE_SIZE, self.match, self.filters,
+            done=lambda rows: self.page(gen, rows), failed=lambda e: self.failed(gen, e)
+        )
+
+    def stamp(self, gen):
+        # read before the rows, so a write in between is applied again, not lost
+        if self.changes:
+            self.db.submit(tasks_version, done=lambda v: self.stamped(gen, v))
+
+    def stamped(self, gen, version):
+        if gen == self.gen:
+            self.version = version
+
+    def page(self, gen, rows):
+        if gen != self.gen:
+            return
+        self.end = len(rows) < PAGE_SIZE or self.match is not None
+        if rows:
+            self.last = rows[-1][0]
+        self.insert(gen, [self.row(r) for r in rows])
+
+    def insert(self, gen, rows):
+        if gen != self.gen:
+            return
+        self.sync.extend(rows[:self.CHUNK])
+        if len(rows) > self.CHUNK:
+            self.tree.after(1, self.insert, gen, rows[self.CHUNK:])
+        else:
+            self.loading = False
+
+    def reload(self):
+        self.gen += 1
+        self.loading = True
+        gen = self.gen
+        limit = max(len(self.sync.rows), PAGE_SIZE)
+        self.stamp(gen)
+        self.db.submit(
+            self.fetch, *self.args, MAX_ID, limit, self.match, self.filters,
+            done=lambda rows: self.reloaded(gen, rows, limit), failed=lambda e: self.failed(gen, e)
+        )
+
+    def reloaded(self, gen, rows, limit):
+        if gen != self.gen:
+            return
+        self.sync.update(self.row(r) for r in rows)
+        self.last = rows[-1][0] if rows else MAX_ID
+        self.end = len(rows) < limit or self.match is not None
+        self.loading = False
+
+    def failed(self, gen, error):
+        # let the next scroll or refresh try again
+        if gen == self.gen:
+            self.loading = False
+        messagebox.showerror("Database", str(error))
+
+    def refresh(self):
+        if not self.changes or self.match is not None or self.version is None:
+            self.reload()
+            return
+        gen = self.gen
+        self.db.submit(
+            self.changes, *self.args, self.version, self.filters,
+            done=lambda r: self.changed(gen, *r)
+        )
+
+    def changed(self, gen, rows, gone, version, more):
+        if gen != self.gen:
+            return
+        if more:
+            self.reload()
+            return
+        self.version = version
+        self.sync.remove(gone)
+        # rows are shown newest (highest id) first; keep negated ids sorted
+        shown = [-int(iid) for iid in self.tree.get_children()]
+        for r in rows:
+            iid, values = self.row(r)
+            if str(iid) not in self.sync.rows and not self.end and iid < self.last:
+                continue   # belongs on a page that isn't loaded yet
+            i = bisect.bisect_left(shown, -iid)
+            if str(iid) not in self.sync.rows:
+                shown.insert(i, -iid)
+            self.sync.put(iid, values, i)
+
+    def search(self, text):
+        self.match = text.strip() or None
+        self.restart()
+
+    def filter(self, **filters):
+        self.filters = {f: v for f, v in filters.items() if v}
+        self.restart()
+
+    def restart(self):
+        self.gen += 1
+        self.sync.update(())
+        self.last, self.end, self.loading, self.version = MAX_ID, False, False, None
+        self.more()
+
+def search_bar(parent, grid):
+    bar = ttk.Frame(parent)
+    q = ttk.Entry(bar, width=32)
+    q.pack(side="left", padx=(0, 5))
+    q.bind("<Return>", lambda e: grid.search(q.get()))
+    ttk.Button(bar, text="SEARCH", command=lambda: grid.search(q.get())).pack(side="left")
+
+    def clear():
+        q.delete(0, "end")
+        grid.search("")
+
+    ttk.Button(bar, text="CLEAR", command=clear).pack(side="left", padx=5)
+    return bar
+
+TASK_FILTERS = (
+    ("status", ("Pending", "Running", "Completed")),
+    ("urgency", ("Regular", "Urgent")),
+    ("model", ("12K", "18K", "24K")),
+)
+
+def filter_bar(parent, grid):
+    bar = ttk.Frame(parent)
+    boxes = {}
+
+    def apply(e=None):
+        grid.filter(**{f: b.get() for f, b in boxes.items() if b.get() != "All"})
+
+    for f, values in TASK_FILTERS:
+        ttk.Label(bar, text=f.upper()).pack(side="left", padx=(10, 2))
+        b = ttk.Combobox(bar, values=("All", *values), state="readonly", width=11)
+        b.set("All")
+        b.bind("<<ComboboxSelected>>", apply)
+        b.pack(side="left")
+        boxes[f] = b
+    return bar
+
+# ================= CHANGE WATCH =================
+
+# auto-refresh poll interval (ms): back off while idle, snap back on change
+POLL_MIN = 1000
+POLL_MAX = 15000
+POLL_BACKOFF = 1.5
+
+class ChangeWatch:
+    """Tells a polling panel whether anyone committed since the last check.
+
+    changed() runs on the DBWorker's long-lived connection and reads PRAGMA
+    data_version, which SQLite bumps whenever another connection commits to
+    the file - a single integer, no table access.
+    """
+    def __init__(self):
+        self.version = None
+
+    def changed(self, conn):
+        v = conn.execute("PRAGMA data_version").fetchone()[0]
+        if v == self.version:
+            return False
+        self.version = v
+        return True
+
+# ================= UTIL =================
+
+def safe_icon(win, icon="icon.ico"):
+    try:
+        if os.path.exists(icon):
+            win.iconbitmap(icon)
+    except:
+        pass
+
+def apply_hacker_theme(root):
+    style = ttk.Style(root)
+    style.theme_use("clam")
+    bg="#0b0f14"; fg="#c9d1d9"; neon="#39ff14"; dark="#161b22"
+    root.configure(bg=bg)
+    style.configure(".", background=bg, foreground=fg, fieldbackground=dark)
+    style.configure("TLabel", font=("Consolas",10))
+    style.configure("TButton", foreground=neon, font=("Consolas",10,"bold"))
+    style.configure("Treeview", background=dark, rowheight=32)
+    style.configure("Treeview.Heading", foreground=neon)
+
+def logout(root, login_win):
+    if messagebox.askyesno("Logout","Do you want to logout?"):
+        root.destroy()
+        login_win.deiconify()
+
+# ================= THEME =================
+
+def apply_hacker_theme(root):
+    style = ttk.Style(root)
+    style.theme_use("clam")
+
+    bg="#0b0f14"; fg="#c9d1d9"; neon="#39ff14"; dark="#161b22"
+    root.configure(bg=bg)
+
+    style.configure(".", background=bg, foreground=fg, fieldbackground=dark)
+    style.configure("TLabel", font=("Consolas",10))
+    style.configure("TButton", foreground=neon, font=("Consolas",10,"bold"))
+    style.configure("Glow.TButton", foreground=bg, background=neon)
+    style.configure("Treeview", background=dark, rowheight=34)
+    style.configure("Treeview.Heading", foreground=neon)
+    style.map("Treeview", background=[("selected","#238636")])
+    # ===== ADMIN NOTEBOOK COLOR FIX =====
+    style.configure(
+        "TNotebook",
+        background=bg,
+        borderwidth=0
+    )
+
+    style.configure(
+        "TNotebook.Tab",
+        background=dark,
+        foreground=fg,
+        padding=(14,6),
+        font=("Consolas",10,"bold")
+    )
+
+    style.map(
+        "TNotebook.Tab",
+        background=[
+            ("selected", neon),
+            ("active", "#1f6feb")
+        ],
+        foreground=[
+            ("selected", bg),
+            ("active", "#ffffff")
+        ]
+    )
+
+
+
+def glow(btn):
+    btn.bind("<Enter>", lambda e: btn.configure(style="Glow.TButton"))
+    btn.bind("<Leave>", lambda e: btn.configure(style="TButton"))
+
+
+# ================= TASK HISTORY =================
+
+def history_popup(parent, db, tree):
+    sel = tree.selection()
+    if not sel:
+        messagebox.showwarning("Select", "Select a task")
+        return
+    tid = tree.item(sel[0])["values"][0]
+
+    win = tk.Toplevel(parent)
+    win.title(f"Task {tid} History")
+    win.geometry("760x320")
+    apply_hacker_theme(win)
+
+    tv = ttk.Treeview(win, columns=("time", "by", "field", "from", "to"), show="headings")
+    for c in tv["columns"]:
+        tv.heading(c, text=c.upper(), anchor="center")
+        tv.column(c, width=140, anchor="center")
+    tv.pack(fill="both", expand=True, padx=10, pady=10)
+
+    def show(rows):
+        for at, by, field, old, new in rows:
+            tv.insert("", "end", values=(
+                fmt_time(at), by or "-", field.replace("_id", ""),
+                "-" if old is None else old, "-" if new is None else new
+            ))
+
+    db.submit(task_history, tid, done=show)
+
+
+# ================= LOGOUT =================
+
+def logout(root, login_win):
+    if messagebox.askyesno("Logout","Do you want to logout?"):
+        root.destroy()
+        login_win.deiconify()
+
+
+# ================= ENGINEER PANEL =================
+
+class EngineerPanel(ttk.Frame):
+    def __init__(self, parent, root, login_win, user):
+        super().__init__(parent)
+        self.root = root
+        self.login_win = login_win
+        self.db = login_win.db
+        self.user_id, self.username, self.name = user
+        self.officer_ids = []        # index-aligned with self.officer's entries
+        self.kept_officer = None     # (name, id) of an edited task's officer
+
+        self.editing_task_id = None
+
+        self.pack(fill="both", expand=True)
+        self.ui()
+
+    def ui(self):
+        # -------- TOP BAR --------
+        top = ttk.Frame(self)
+        top.pack(fill="x", padx=10)
+
+        ttk.Label(
+            top,
+            text=f"ENGINEER PANEL – {self.name} ({self.username})",
+            font=("Consolas", 14, "bold"),
+            foreground="#39ff14"
+        ).pack(side="left")
+
+        b = ttk.Button(
+            top, text="LOGOUT",
+            command=lambda: logout(self.root, self.login_win)
+        )
+        b.pack(side="right")
+        glow(b)
+        ttk.Label(top, textvariable=self.db.busy).pack(side="right", padx=10)
+
+        # -------- TASK ENTRY --------
+        entry = ttk.LabelFrame(self, text="Add / Edit Task", padding=10)
+        entry.pack(fill="x", padx=10, pady=10)
+
+        self.title = ttk.Entry(entry, width=35)
+        self.model = ttk.Combobox(
+            entry,
+            values=["12K", "18K", "24K", "30K", "Portable"],
+            state="readonly",
+            width=15
+        )
+        self.urgency = ttk.Combobox(
+            entry,
+            values=["Regular", "Urgent", "Most Urgent"],
+            state="readonly",
+            width=14
+        )
+        self.officer = ttk.Combobox(
+            entry,
+            state="readonly",
+            width=20
+        )
+        self.db.submit(roster, "officer", done=self.set_officers)
+
+        fields = [
+            ("Task", self.title),
+            ("Model", self.model),
+            ("Urgency", self.urgency),
+            ("Officer", self.officer)
+        ]
+
+        for i, (l, w) in enumerate(fields):
+            ttk.Label(entry, text=l).grid(row=0, column=i * 2)
+            w.grid(row=0, column=i * 2 + 1, padx=4)
+
+        self.add_btn = ttk.Button(entry, text="ADD TASK", command=self.add_or_update_task)
+        self.add_btn.grid(row=0, column=8, padx=10)
+        glow(self.add_btn)
+
+        # -------- TASK LIST --------
+        box = ttk.Frame(self)
+        box.pack(fill="both", expand=True, padx=10, pady=10)
+
+        self.tree = ttk.Treeview(
+            box,
+            columns=("id", "details", "model", "urgency", "officer", "status", "time", "officer_id"),
+            displaycolumns=("id", "details", "model", "urgency", "officer", "status", "time"),
+            show="headings"
+        )
+
+        heads = ["ID", "TASK DETAILS", "MODEL", "URGENCY", "OFFICER", "STATUS", "TIME"]
+        for i, c in enumerate(self.tree["displaycolumns"]):
+            self.tree.heading(c, text=heads[i], anchor="center")
+            self.tree.column(c, width=70, anchor="center")
+
+        self.tree.column("details", width=350)
+        self.tree.pack(side="left", fill="both", expand=True)
+        sb = ttk.Scrollbar(box, orient="vertical")
+        sb.pack(side="right", fill="y")
+        self.tasks = PagedGrid(
+            self.db, self.tree, sb, engineer_tasks, self.user_id,
+            row=lambda r: (r[0], (r[0], wrap_text(r[1]), r[2], r[3], r[4], r[5], fmt_time(r[6]),
+                                  "" if r[7] is None else r[7]))
+        )
+        search_bar(self, self.tasks).pack(fill="x", padx=10, before=box)
+
+        # -------- EDIT BUTTON --------
+        btn_frame = ttk.Frame(self)
+        btn_frame.pack(pady=5)
+
+        edit_btn = ttk.Button(btn_frame, text="EDIT TASK", command=self.load_for_edit)
+        edit_btn.pack(side="left", padx=5)
+        glow(edit_btn)
+
+        hist_btn = ttk.Button(
+            btn_frame, text="HISTORY",
+            command=lambda: history_popup(self, self.db, self.tree)
+        )
+        hist_btn.pack(side="left", padx=5)
+        glow(hist_btn)
+
+    # -------- ADD / UPDATE TASK --------
+    def add_or_update_task(self):
+        officer_id = self.selected_officer()
+        if not all([
+            self.title.get(),
+            self.model.get(),
+            self.urgency.get(),
+            officer_id
+        ]):
+            messagebox.showwarning("Missing", "Fill all fields")
+            return
+
+        editing = self.editing_task_id
+
+        def saved(_):
+            if editing:
+                messagebox.showinfo("Updated", "Task updated successfully")
+            self.load()
+
+        self.db.submit(
+            save_task,
+            editing,
+            self.title.get(),
+            self.model.get(),
+            self.urgency.get(),
+            self.user_id,
+            officer_id,
+            done=saved
+        )
+        self.editing_task_id = None
+        self.add_btn.config(text="ADD TASK")
+        self.clear_fields()
+
+    # -------- LOAD TASK FOR EDIT --------
+    def load_for_edit(self):
+        selected = self.tree.focus()
+        if not selected:
+            messagebox.showwarning("Select Task", "Select a task to edit")
+            return
+
+        values = self.tree.item(selected, "values")
+        self.editing_task_id = values[0]
+
+        self.title.delete(0, "end")
+        self.title.insert(0, values[1])
+        self.model.set(values[2])
+        self.urgency.set(values[3])
+        # the task's officer may have left the roster (deleted, or a
+        # login-less user from the migration); keep them unless changed
+        officer_id = int(values[7]) if values[7] != "" else None
+        self.kept_officer = (values[4], officer_id) if officer_id else None
+        if officer_id in self.officer_ids:
+            self.officer.current(self.officer_ids.index(officer_id))
+        else:
+            self.officer.set(values[4])
+
+        self.add_btn.config(text="UPDATE TASK")
+
+    # -------- LOAD TASK LIST --------
+    def load(self):
+        self.tasks.reload()
+
+    def set_officers(self, rows):
+        self.officer_ids = [uid for uid, _, _ in rows]
+        self.officer["values"] = [roster_label(name, username) for _, name, username in rows]
+
+    def selected_officer(self):
+        i = self.officer.current()
+        if i >= 0:
+            return self.officer_ids[i]
+        if self.kept_officer and self.officer.get() == self.kept_officer[0]:
+            return self.kept_officer[1]
+        return None
+
+    def clear_fields(self):
+        self.title.delete(0, "end")
+        self.model.set("")
+        self.urgency.set("")
+        self.officer.set("")
+        self.kept_officer = None
+# ================= TECHNICIAN PANEL =================
+
+class TechnicianPanel(ttk.Frame):
+    def __init__(self,parent,root,login_win,user):
+        super().__init__(parent)
+        self.root=root
+        self.login_win=login_win
+        self.db=login_win.db
+        self.user_id,self.username,self.name=user
+
+        self.pack(fill="both",expand=True)
+        self.ui()
+
+    def ui(self):
+        top=ttk.Frame(self); top.pack(fill="x",padx=10)
+        ttk.Label(top,text=f"TECHNICIAN PANEL – {self.name}",
+                  font=("Consolas",14,"bold"),foreground="#39ff14").pack(side="left")
+        ttk.Button(top,text="LOGOUT",
+                   command=lambda:logout(self.root,self.login_win)).pack(side="right")
+        ttk.Label(top,textvariable=self.db.busy).pack(side="right",padx=10)
+
+        box=ttk.Frame(self); box.pack(fill="both",expand=True,padx=10,pady=10)
+        self.tree=ttk.Treeview(
+            box,
+            columns=("id","title","engineer","status","progress"),
+            show="headings"
+        )
+        for c in self.tree["columns"]:
+            self.tree.heading(c,text=c.upper())
+            self.tree.column(c,width=180)
+        self.tree.pack(side="left",fill="both",expand=True)
+        sb=ttk.Scrollbar(box,orient="vertical"); sb.pack(side="right",fill="y")
+        self.tasks=PagedGrid(self.db,self.tree,sb,technician_tasks,self.user_id)
+        search_bar(self,self.tasks).pack(fill="x",padx=10,before=box)
+
+        self.scale=ttk.Scale(self,from_=0,to=100,orient="horizontal")
+        self.scale.pack(pady=5)
+
+        ttk.Button(self,text="UPDATE PROGRESS",
+                   command=self.update_progress).pack()
+        ttk.Button(self,text="HISTORY",
+                   command=lambda:history_popup(self,self.db,self.tree)).pack(pady=5)
+
+    def load(self):
+        self.tasks.reload()
+
+    def update_progress(self):
+        sel=self.tree.selection()
+        if not sel: return
+        tid=self.tree.item(sel[0])["values"][0]
+        p=int(self.scale.get())
+        self.db.submit(set_progress,tid,p,self.user_id,done=lambda _:self.load())
+
+
+# ================= OFFICER PANEL =================
+
+class OfficerPanel(ttk.Frame):
+    def __init__(self, parent, root, login_win, user):
+        super().__init__(parent)
+        self.root = root
+        self.login_win = login_win
+        self.db = login_win.db
+        self.user_id, self.username, self.name = user
+
+        self.watch = ChangeWatch()
+        self.poll = POLL_MIN
+        self.db.submit(self.watch.changed, quiet=True)   # baseline before the first load
+        self.pack(fill="both", expand=True)
+        self.ui()
+        self.after(self.poll, self.auto_refresh)   # 🔥 live refresh
+
+    # ---------------- UI ----------------
+    def ui(self):
+        # ---- TOP BAR ----
+        top = ttk.Frame(self)
+        top.pack(fill="x", padx=10, pady=10)
+
+        ttk.Label(
+            top,
+            text=f"OFFICER PANEL – {self.name}",
+            font=("Consolas", 16, "bold"),
+            foreground="#39ff14"
+        ).pack(side="left")
+
+        ttk.Button(
+            top,
+            text="Logout",
+            command=self.logout
+        ).pack(side="right", padx=5)
+        ttk.Label(top, textvariable=self.db.busy).pack(side="right", padx=10)
+
+        # ---- TASK LIST ----
+        box = ttk.Frame(self)
+        box.pack(fill="both", expand=True, padx=10, pady=10)
+
+        self.tree = ttk.Treeview(
+            box,
+            columns=(
+                "id", "task", "engineer", "technician",
+                "status", "progress", "updated"
+            ),
+            show="headings"
+        )
+
+        headings = [
+            "ID", "TASK", "ENGINEER",
+            "TECHNICIAN", "STATUS", "PROGRESS %", "UPDATED"
+        ]
+
+        for col, head in zip(self.tree["columns"], headings):
+            self.tree.heading(col, text=head, anchor="center")
+            self.tree.column(col, width=140, anchor="center")
+
+        self.tree.column("task", width=360)
+        self.tree.configure(selectmode="extended")   # ctrl/shift-click for bulk actions
+
+        self.tree.pack(side="left", fill="both", expand=True)
+        sb = ttk.Scrollbar(box, orient="vertical")
+        sb.pack(side="right", fill="y")
+        self.tasks = PagedGrid(
+            self.db, self.tree, sb, officer_tasks, self.user_id,
+            row=lambda r: (r[0], (*r[:6], fmt_time(r[6]))), changes=officer_changes
+        )
+        tools = ttk.Frame(self)
+        tools.pack(fill="x", padx=10, before=box)
+        search_bar(tools, self.tasks).pack(side="left")
+        filter_bar(tools, self.tasks).pack(side="left")
+
+        # ---- ACTION BUTTONS ----
+        btns = ttk.Frame(self)
+        btns.pack(pady=8)
+
+        ttk.Button(
+            btns,
+            text="Assign Technician",
+            command=self.assign_popup
+        ).pack(side="left", padx=5)
+
+        ttk.Button(
+            btns,
+            text="Set Running",
+            command=lambda: self.update_status("Running")
+        ).pack(side="left", padx=5)
+
+        ttk.Button(
+            btns,
+            text="Set Completed",
+            command=lambda: self.update_status("Completed")
+        ).pack(side="left", padx=5)
+
+        ttk.Button(
+            btns,
+            text="History",
+            command=lambda: history_popup(self, self.db, self.tree)
+        ).pack(side="left", padx=5)
+
+    # ---------------- LOAD TASKS ----------------
+    def load(self):
+        self.tasks.refresh()   # only the rows written since the last look
+
+    # ---------------- AUTO REFRESH ----------------
+    def auto_refresh(self):
+        # the check runs on the DB worker; the next tick is scheduled only
+        # once its answer is back, so slow I/O never piles up requests
+        # a failed check (file locked, share slow) just backs off and retries
+        self.db.submit(self.watch.changed, done=self.refreshed, failed=lambda e: self.refreshed(False),
+                       quiet=True)
+
+    def refreshed(self, changed):
+        if changed:
+            self.load()
+            self.poll = POLL_MIN
+        else:
+            self.poll = min(int(self.poll * POLL_BACKOFF), POLL_MAX)
+        self.after(self.poll, self.auto_refresh)   # 🔁 1s .. 15s
+
+    # ---------------- UPDATE STATUS ----------------
+    def update_status(self, status):
+        sel = self.tree.selection()
+        if not sel:
+            messagebox.showwarning("Select", "Select a task")
+            return
+
+        ids = [self.tree.item(i)["values"][0] for i in sel]
+        self.db.submit(set_status, ids, status, self.user_id, done=lambda _: self.load())
+
+    # ---------------- ASSIGN TECHNICIAN ----------------
+    def assign_popup(self):
+        sel = self.tree.selection()
+        if not sel:
+            messagebox.showwarning("Select", "Select a task")
+            return
+
+        ids = [self.tree.item(i)["values"][0] for i in sel]
+
+        win = tk.Toplevel(self)
+        win.title(f"Assign Technician ({len(ids)} tasks)" if len(ids) > 1 else "Assign Technician")
+        win.geometry("300x200")
+        apply_hacker_theme(win)
+
+        ttk.Label(
+            win,
+            text="Select Technician",
+            font=("Consolas", 12, "bold"),
+            foreground="#39ff14"
+        ).pack(pady=10)
+
+        tech = ttk.Combobox(win, state="readonly", width=26)
+        tech.pack(pady=10)
+
+        tech_ids = []   # index-aligned with tech's entries
+
+        def fill(rows):
+            tech_ids[:] = [uid for uid, _, _ in rows]
+            tech["values"] = [roster_label(name, username) for _, name, username in rows]
+
+        self.db.submit(roster, "technician", done=fill)
+
+        def assign():
+            if tech.current() < 0:
+                return
+            self.db.submit(
+                assign_technician, ids, tech_ids[tech.current()], self.user_id,
+                done=lambda _: self.load()
+            )
+            win.destroy()
+
+        ttk.Button(win, text="ASSIGN", command=assign).pack(pady=15)
+
+    # ---------------- LOGOUT ----------------
+    def logout(self):
+        if messagebox.askyesno("Logout", "Do you want to logout?"):
+            self.root.destroy()
+            self.login_win.deiconify()
+
+
+
+# ================= ADMIN PANEL =================
+
+class AdminPanel(ttk.Frame):
+    def __init__(self,parent,root,login_win):
+        super().__init__(parent)
+        self.root=root
+        self.login_win=login_win
+        self.db=login_win.db
+
+        self.watch=ChangeWatch()
+        self.poll=POLL_MIN
+        self.db.submit(self.watch.changed,quiet=True)   # baseline before the first load
+        self.pack(fill="both",expand=True)
+        self.ui()
+        self.after(self.poll,self.auto_refresh)   # live report
+
+    def ui(self):
+        top=ttk.Frame(self); top.pack(fill="x",padx=10)
+        ttk.Label(
+            top,
+            text="ADMIN DASHBOARD",
+            font=("Consolas",15,"bold"),
+            foreground="#39ff14"
+        ).pack(side="left")
+
+        b=ttk.Button(
+            top,
+            text="LOGOUT",
+            command=lambda:logout(self.root,self.login_win)
+        )
+        b.pack(side="right")
+        glow(b)
+        ttk.Label(top,textvariable=self.db.busy).pack(side="right",padx=10)
+
+        nb=ttk.Notebook(self)
+        nb.pack(fill="both",expand=True)
+
+        self.users_frame=ttk.Frame(nb)
+        self.tasks_frame=ttk.Frame(nb)
+        self.report_frame=ttk.Frame(nb)
+
+        nb.add(self.users_frame,text="👤 USERS")
+        nb.add(self.tasks_frame,text="📝 TASKS")
+        nb.add(self.report_frame,text="📊 REPORT")
+
+        self.users_tab()
+        self.tasks_tab()
+        self.report_tab()
+
+    # ---------- USERS TAB ----------
+    def users_tab(self):
+        f=self.users_frame
+
+        top=ttk.LabelFrame(f,text="Create User",padding=10)
+        top.pack(fill="x",padx=10,pady=5)
+
+        name=ttk.Entry(top,width=18)
+        username=ttk.Entry(top,width=14)
+        password=ttk.Entry(top,width=14,show="*")
+
+        # ✅ Technician role added here
+        role=ttk.Combobox(
+            top,
+            values=["admin","engineer","officer","technician"],
+            state="readonly",
+            width=14
+        )
+
+        fields=[
+            ("Name",name),
+            ("Username",username),
+            ("Password",password),
+            ("Role",role)
+        ]
+
+        for i,(l,w) in enumerate(fields):
+            ttk.Label(top,text=l).grid(row=0,column=i*2)
+            w.grid(row=0,column=i*2+1,padx=4)
+
+        def create_user():
+            if not all([name.get(),username.get(),password.get(),role.get()]):
+                messagebox.showwarning("Missing","Fill all fields")
+                return
+
+            self.db.submit(
+                add_user,
+                username.get(),
+                password.get(),
+                role.get(),
+                name.get(),
+                done=lambda _:self.load_users()
+            )
+
+        b=ttk.Button(top,text="CREATE",command=create_user)
+        b.grid(row=0,column=8,padx=10)
+        glow(b)
+
+        self.tv=ttk.Treeview(
+            f,
+            columns=("name","username","role"),
+            show="headings"
+        )
+
+        for c in self.tv["columns"]:
+            self.tv.heading(c,text=c.upper(),anchor="center")
+            self.tv.column(c,width=200,anchor="center")
+
+        self.tv.pack(fill="both",expand=True,padx=10,pady=10)
+        self.user_rows=TreeSync(self.tv)
+
+        d=ttk.Button(
+            f,
+            text="DELETE SELECTED USER",
+            command=self.delete_user
+        )
+        d.pack(pady=5)
+        glow(d)
+
+        self.load_users()
+
+    def load_users(self):
+        self.db.submit(list_users,
+                       done=lambda rows:self.user_rows.update((r[1],r) for r in rows))
+
+    def delete_user(self):
+        sel=self.tv.selection()
+        if not sel: return
+        uname=self.tv.item(sel[0])["values"][1]
+        if uname=="admin": return
+
+        self.db.submit(remove_user,uname,done=lambda _:self.load_users())
+
+    # ---------- TASKS TAB ----------
+    def tasks_tab(self):
+        bar=ttk.Frame(self.tasks_frame); bar.pack(fill="x",padx=10,pady=(10,0))
+        b=ttk.Button(bar,text="⟳ REFRESH",command=self.load_tasks)
+        b.pack(side="right")
+        glow(b)
+        h=ttk.Button(bar,text="HISTORY",
+                     command=lambda:history_popup(self,self.db,self.task_tv))
+        h.pack(side="right",padx=5)
+        glow(h)
+
+        box=ttk.Frame(self.tasks_frame)
+        box.pack(fill="both",expand=True,padx=10,pady=10)
+        tv=ttk.Treeview(
+            box,
+            columns=("id","title","model","urgency","engineer","officer","status","time"),
+            show="headings"
+        )
+
+        for c in tv["columns"]:
+            tv.heading(c,text=c.upper(),anchor="center")
+            tv.column(c,width=120,anchor="center")
+
+        tv.pack(side="left",fill="both",expand=True)
+        self.task_tv=tv
+        sb=ttk.Scrollbar(box,orient="vertical"); sb.pack(side="right",fill="y")
+        self.tasks=PagedGrid(self.db,tv,sb,all_tasks,
+                             row=lambda r:(r[0],(*r[:7],fmt_time(r[7]))))
+        search_bar(bar,self.tasks).pack(side="left")
+        filter_bar(bar,self.tasks).pack(side="left")
+
+    def load_tasks(self):
+        self.tasks.reload()
+
+    # ---------- REPORT TAB ----------
+    def report_tab(self):
+        tv=ttk.Treeview(
+            self.report_frame,
+            columns=("role","name","pending","running","completed"),
+            show="headings"
+        )
+
+        for c in tv["columns"]:
+            tv.heading(c,text=c.upper(),anchor="center")
+            tv.column(c,width=180,anchor="center")
+
+        tv.pack(fill="both",expand=True,padx=10,pady=10)
+        self.report_rows=TreeSync(tv)
+        self.load_report()
+
+    def load_report(self):
+        self.db.submit(status_report,
+                       done=lambda rows:self.report_rows.update(
+                           (f"{r[0]}-{r[1]}",(r[0],*r[2:])) for r in rows))
+
+    def auto_refresh(self):
+        self.db.submit(self.watch.changed,done=self.refreshed,failed=lambda e: self.refreshed(False),quiet=True)
+
+    def refreshed(self,changed):
+        if changed:
+            self.load_report()
+            self.poll=POLL_MIN
+        else:
+            self.poll=min(int(self.poll*POLL_BACKOFF),POLL_MAX)
+        self.after(self.poll,self.auto_refresh)
+
+
+# ================= LOGIN =================
+
+class Login(tk.Tk):
+    def __init__(self):
+        super().__init__()
+        self.title("Login")
+        self.geometry("360x260")
+        apply_hacker_theme(self)
+        self.db=DBWorker(self)
+
+        f=ttk.Frame(self,padding=20); f.pack(fill="both",expand=True)
+        ttk.Label(f,text="DAILY WORK UPDATE",
+                  font=("Consolas",14,"bold"),
+                  foreground="#39ff14").pack(pady=10)
+
+        ttk.Label(f,text="User ID").pack(anchor="w")
+        self.u=ttk.Entry(f); self.u.pack(fill="x")
+        ttk.Label(f,text="Password").pack(anchor="w",pady=(10,0))
+        self.p=ttk.Entry(f,show="*"); self.p.pack(fill="x")
+
+        ttk.Button(f,text="LOGIN",command=self.login).pack(pady=15)
+        ttk.Label(f,textvariable=self.db.busy).pack()
+
+    def login(self):
+        self.db.submit(authenticate,self.u.get(),self.p.get(),done=self.logged_in)
+
+    def logged_in(self,r):
+        if not r:
+            messagebox.showerror("Error","Invalid Login")
+            return
+
+        self.withdraw()
+        self.dashboard=tk.Toplevel(self)
+        self.dashboard.geometry("1200x600")
+        apply_hacker_theme(self.dashboard)
+
+        uid,role,name=r; user=(uid,self.u.get(),name)
+
+        if role=="admin":
+            AdminPanel(self.dashboard,self.dashboard,self)
+        elif role=="engineer":
+            EngineerPanel(self.dashboard,self.dashboard,self,user)
+        elif role=="officer":
+            OfficerPanel(self.dashboard,self.dashboard,self,user)
+        elif role=="technician":
+            TechnicianPanel(self.dashboard,self.dashboard,self,user)
+
+# ================= EXPORT =================
+# Same output as web_app's /export/tasks.csv and .ndjson, for shops that
+# only run the desktop app:
+#   python desktop_app.py export -o tasks.csv --status Completed --from 2026-01-01
+
+EXPORT_CHUNK = 500
+
+def export_cli(argv):
+    ap = argparse.ArgumentParser(prog="desktop_app.py export", description="Export tasks as CSV or NDJSON.")
+    ap.add_argument("-o", "--output", help="file to write (default: stdout)")
+    ap.add_argument("--format", choices=("csv", "ndjson"), help="default: from the file extension, else csv")
+    ap.add_argument("--status", choices=("Pending", "Running", "Completed"))
+    ap.add_argument("--from", dest="since", metavar="YYYY-MM-DD", help="created on or after")
+    ap.add_argument("--to", dest="until", metavar="YYYY-MM-DD", help="created on or before")
+    ap.add_argument("--user", help="only tasks of this username")
+    a = ap.parse_args(argv)
+    fmt = a.format or ("ndjson" if (a.output or "").endswith(".ndjson") else "csv")
+
+    conn = get_db()
+    user_id = None
+    if a.user:
+        row = conn.execute("SELECT id FROM users WHERE username=?", (a.user,)).fetchone()
+        if not row:
+            sys.exit(f"unknown user {a.user!r}")
+        user_id = row[0]
+
+    cur = conn.execute(*export_query(user_id, a.status, a.since, a.until))
+    out = open(a.output, "w", newline="", encoding="utf-8") if a.output else sys.stdout
+    try:
+        w = csv.writer(out)
+        if fmt == "csv":
+            w.writerow(EXPORT_FIELDS)
+        # stream: only EXPORT_CHUNK rows are ever held at once
+        while rows := cur.fetchmany(EXPORT_CHUNK):
+            if fmt == "csv":
+                w.writerows(rows)
+            else:
+                out.writelines(json.dumps(dict(zip(EXPORT_FIELDS, r))) + "\n" for r in rows)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        conn.close()
+
+# ================= MAIN =================
+
+if __name__=="__main__":
+    init_db()
+    if sys.argv[1:2] == ["export"]:
+        export_cli(sys.argv[2:])
+    else:
+        Login().mainloop()
+
@@ -0,0 +1,343 @@
+"""Schema, migrations and the task queries shared by web_app and desktop_app.
+
+Both apps open the same database file, and every trigger here is created
+IF NOT EXISTS, so whichever app opens a file first decides what it keeps.
+Keeping one copy of the DDL is what keeps the two apps in step.
+"""
+from datetime import datetime
+
+# Timestamps are stored as local ISO-8601 ("2026-01-03 12:12:00") so they
+# sort and range-query in SQL; the old display format is only parsed once.
+LEGACY_TIME = "%d-%b-%Y %I:%M %p"
+ISO_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*"
+
+ROLE_COLS = ("engineer_id", "officer_id", "technician_id")
+
+USERS_SQL = """
+CREATE TABLE IF NOT EXISTS {}(
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT UNIQUE,
+    password_hash TEXT,
+    role TEXT,
+    name TEXT
+)"""
+
+TASKS_SQL = """
+CREATE TABLE IF NOT EXISTS {}(
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT,
+    model TEXT,
+    urgency TEXT,
+    engineer_id INTEGER REFERENCES users(id),
+    officer_id INTEGER REFERENCES users(id),
+    technician_id INTEGER REFERENCES users(id),
+    status TEXT,
+    progress INTEGER DEFAULT 0,
+    start_time TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    version INTEGER NOT NULL DEFAULT 0
+)"""
+
+# Per-table change counters bumped by triggers, so any writer (web or
+# desktop) invalidates cached reads; see /api/tasks. Every task write also
+# stamps the row with the new tasks counter (tasks.version) and deletes
+# leave a tombstone, which is what /api/tasks/changes and the desktop's
+# officer list sync from.
+COUNTERS_SQL = """
+CREATE TABLE IF NOT EXISTS counters(name TEXT PRIMARY KEY, value INTEGER NOT NULL DEFAULT 0);
+INSERT OR IGNORE INTO counters(name) VALUES ('tasks'),('users');
+""" + "".join(f"""
+CREATE TRIGGER IF NOT EXISTS users_{op.lower()}_count AFTER {op} ON users
+BEGIN UPDATE counters SET value=value+1 WHERE name='users'; END;
+""" for op in ("INSERT", "UPDATE", "DELETE")) + """
+CREATE TABLE IF NOT EXISTS task_tombstones(task_id INTEGER PRIMARY KEY, version INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS idx_task_tombstones_version ON task_tombstones(version);
+CREATE INDEX IF NOT EXISTS idx_tasks_version ON tasks(version);
+
+CREATE TRIGGER IF NOT EXISTS tasks_insert_version AFTER INSERT ON tasks BEGIN
+    UPDATE counters SET value=value+1 WHERE name='tasks';
+    UPDATE tasks SET version=(SELECT value FROM counters WHERE name='tasks') WHERE id=NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_update_version AFTER UPDATE ON tasks
+WHEN NEW.version=OLD.version BEGIN
+    UPDATE counters SET value=value+1 WHERE name='tasks';
+    UPDATE tasks SET version=(SELECT value FROM counters WHERE name='tasks') WHERE id=NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_delete_version AFTER DELETE ON tasks BEGIN
+    UPDATE counters SET value=value+1 WHERE name='tasks';
+    INSERT OR REPLACE INTO task_tombstones VALUES (OLD.id,(SELECT value FROM counters WHERE name='tasks'));
+END;
+
+-- rows written before versions existed get distinct versions once
+UPDATE tasks SET version=(SELECT value FROM counters WHERE name='tasks')+id WHERE version=0;
+UPDATE counters SET value=max(value,(SELECT IFNULL(max(version),0) FROM tasks)) WHERE name='tasks';
+"""
+
+# Per-user status counts for the report, kept current by triggers so the
+# report reads one row per (user, role, status) instead of scanning tasks.
+STATUS_COUNTS_SQL = """
+CREATE TABLE IF NOT EXISTS task_status_counts(
+    user_id INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    status TEXT NOT NULL,
+    n INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY(user_id,role,status)
+) WITHOUT ROWID;
+
+-- first run: build the counts from the rows that are already there
+INSERT INTO task_status_counts
+""" + " UNION ALL ".join(f"""
+SELECT {r}_id,'{r}',status,count(*) FROM tasks
+WHERE {r}_id IS NOT NULL AND status IS NOT NULL
+AND NOT EXISTS (SELECT 1 FROM task_status_counts) GROUP BY {r}_id,status
+""" for r in ("engineer", "officer", "technician")) + """;
+
+CREATE TRIGGER IF NOT EXISTS tasks_insert_status AFTER INSERT ON tasks BEGIN
+""" + "".join(f"""
+    INSERT INTO task_status_counts SELECT NEW.{r}_id,'{r}',NEW.status,1
+    WHERE NEW.{r}_id IS NOT NULL AND NEW.status IS NOT NULL
+    ON CONFLICT DO UPDATE SET n=n+1;""" for r in ("engineer", "officer", "technician")) + """
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_update_status
+AFTER UPDATE OF status,engineer_id,officer_id,technician_id ON tasks BEGIN
+""" + "".join(f"""
+    UPDATE task_status_counts SET n=n-1 WHERE user_id=OLD.{r}_id AND role='{r}' AND status=OLD.status;
+    INSERT INTO task_status_counts SELECT NEW.{r}_id,'{r}',NEW.status,1
+    WHERE NEW.{r}_id IS NOT NULL AND NEW.status IS NOT NULL
+    ON CONFLICT DO UPDATE SET n=n+1;""" for r in ("engineer", "officer", "technician")) + """
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_delete_status AFTER DELETE ON tasks BEGIN
+""" + "".join(f"""
+    UPDATE task_status_counts SET n=n-1 WHERE user_id=OLD.{r}_id AND role='{r}' AND status=OLD.status;"""
+    for r in ("engineer", "officer", "technician")) + """
+END;
+"""
+
+# Append-only audit trail of task changes: one row per changed field,
+# written in the same transaction as the change itself (see log_changes).
+EVENTS_SQL = """
+CREATE TABLE IF NOT EXISTS task_events(
+    id INTEGER PRIMARY KEY,
+    task_id INTEGER NOT NULL,
+    actor_id INTEGER REFERENCES users(id),
+    field TEXT NOT NULL,
+    old,
+    new,
+    at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_task_events_task ON task_events(task_id,id);
+CREATE INDEX IF NOT EXISTS idx_task_events_at ON task_events(at);
+CREATE TRIGGER IF NOT EXISTS task_events_no_update BEFORE UPDATE ON task_events
+BEGIN SELECT RAISE(ABORT,'task_events is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS task_events_no_delete BEFORE DELETE ON task_events
+BEGIN SELECT RAISE(ABORT,'task_events is append-only'); END;
+"""
+
+# Full-text index over task titles: an external-content FTS5 table that
+# stores only the index, kept in step with tasks by triggers.
+SEARCH_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+    title, content='tasks', content_rowid='id', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+    INSERT INTO tasks_fts(rowid,title) VALUES (NEW.id,NEW.title);
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+    INSERT INTO tasks_fts(tasks_fts,rowid,title) VALUES ('delete',OLD.id,OLD.title);
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title ON tasks BEGIN
+    INSERT INTO tasks_fts(tasks_fts,rowid,title) VALUES ('delete',OLD.id,OLD.title);
+    INSERT INTO tasks_fts(rowid,title) VALUES (NEW.id,NEW.title);
+END;
+"""
+
+def create_schema(conn):
+    """Creates the tables, indexes and triggers, upgrading an older database
+    in place. Safe to run on every start; commits when done."""
+    conn.execute("PRAGMA foreign_keys=OFF")   # migrate_user_ids rebuilds tables
+    cur = conn.cursor()
+    cur.execute(USERS_SQL.format("users"))
+    cur.execute(TASKS_SQL.format("tasks"))
+    migrate_user_ids(conn)
+    migrate_timestamps(conn)
+    if "version" not in [r[1] for r in cur.execute("PRAGMA table_info(tasks)")]:
+        cur.execute("ALTER TABLE tasks ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+    # every task list filters on one of these columns
+    for col in (*ROLE_COLS, "status", "updated_at"):
+        cur.execute(f"CREATE INDEX IF NOT EXISTS idx_tasks_{col} ON tasks({col})")
+    # filtered views. (role column, status) keeps rows in id order for the
+    # common status filter; adding urgency as a third column made status-only
+    # pages sort every match (~70-190 ms vs <1 ms on 200k tasks)
+    for col in ROLE_COLS:
+        cur.execute(f"CREATE INDEX IF NOT EXISTS idx_tasks_{col}_status ON tasks({col},status)")
+        # sort by last update: each per-role leg reads its newest versions in order
+        cur.execute(f"CREATE INDEX IF NOT EXISTS idx_tasks_{col}_version ON tasks({col},version)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status_urgency ON tasks(status,urgency)")
+
+    conn.executescript(COUNTERS_SQL)
+    conn.executescript(STATUS_COUNTS_SQL)
+    conn.executescript(EVENTS_SQL)
+    fresh = not cur.execute("SELECT 1 FROM sqlite_master WHERE name='tasks_fts'").fetchone()
+    conn.executescript(SEARCH_SQL)
+    if fresh:   # index the titles that are already there
+        cur.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+    conn.commit()
+
+def migrate_user_ids(conn):
+    """One-shot upgrade of databases whose tasks store display names.
+
+    Gives users an integer id, strips the " - <username>" suffix the desktop
+    app used to bake into names, and rebuilds tasks with *_id columns. Names
+    that match no user (deleted accounts) become login-less user rows so the
+    history keeps its names.
+    """
+    cur = conn.cursor()
+    cur.execute("BEGIN IMMEDIATE")
+
+    def cols(table):
+        return [r[1] for r in cur.execute(f"PRAGMA table_info({table})")]
+
+    task_cols = cols("tasks")
+    if "engineer_id" in task_cols:
+        conn.commit()
+        return
+
+    if "id" not in cols("users"):
+        cur.execute(USERS_SQL.format("users_new"))
+        cur.execute("""
+            INSERT INTO users_new(username, password_hash, role, name)
+            SELECT username, password_hash, role, name FROM users ORDER BY rowid
+        """)
+        cur.execute("DROP TABLE users")
+        cur.execute("ALTER TABLE users_new RENAME TO users")
+
+    for uid, username, name in cur.execute("SELECT id, username, name FROM users").fetchall():
+        base = (name or "").strip()
+        if username and base.endswith(f" - {username}"):
+            base = base[:-len(f" - {username}")].strip()
+        if base != name:
+            cur.execute("UPDATE users SET name=? WHERE id=?", (base, uid))
+
+    users = cur.execute("SELECT id, username, role, name FROM users").fetchall()
+
+    def resolve(role, name):
+        key = (name or "").strip()
+        if not key:
+            return None
+        for same_role in (True, False):
+            for uid, username, r, n in users:
+                if same_role and r != role:
+                    continue
+                if key == n or key == f"{n} - {username}":
+                    return uid
+        cur.execute(
+            "INSERT INTO users(username, password_hash, role, name) VALUES (NULL,NULL,?,?)",
+            (role, key)
+        )
+        users.append((cur.lastrowid, None, role, key))
+        return cur.lastrowid
+
+    cur.execute("CREATE TEMP TABLE name_map(col TEXT, name TEXT, uid INTEGER, PRIMARY KEY(col, name))")
+    for col in ("engineer", "officer", "technician"):
+        names = cur.execute(f"SELECT DISTINCT {col} FROM tasks WHERE {col} IS NOT NULL").fetchall()
+        for (name,) in names:
+            cur.execute("INSERT INTO name_map VALUES (?,?,?)", (col, name, resolve(col, name)))
+
+    seq = cur.execute("SELECT seq FROM sqlite_sequence WHERE name='tasks'").fetchone()
+    start_time = "t.start_time" if "start_time" in task_cols else "NULL"
+    cur.execute(TASKS_SQL.format("tasks_new"))
+    cur.execute(f"""
+        INSERT INTO tasks_new
+        (id, title, model, urgency, engineer_id, officer_id, technician_id,
+         status, progress, start_time, created_at, updated_at)
+        SELECT t.id, t.title, t.model, t.urgency,
+            (SELECT uid FROM name_map WHERE col='engineer' AND name=t.engineer),
+            (SELECT uid FROM name_map WHERE col='officer' AND name=t.officer),
+            (SELECT uid FROM name_map WHERE col='technician' AND name=t.technician),
+            t.status, t.progress, {start_time}, t.created_at, t.updated_at
+        FROM tasks t
+    """)
+    cur.execute("DROP TABLE tasks")
+    cur.execute("DROP TABLE name_map")
+    cur.execute("ALTER TABLE tasks_new RENAME TO tasks")
+    if seq:
+        cur.execute("UPDATE sqlite_sequence SET seq=max(seq,?) WHERE name='tasks'", seq)
+    conn.commit()
+
+def migrate_timestamps(conn):
+    """Rewrite created_at/updated_at still in the old "%d-%b-%Y %I:%M %p" form."""
+    def iso(v):
+        try:
+            return datetime.strptime(v.strip(), LEGACY_TIME).isoformat(" ", "seconds")
+        except (AttributeError, ValueError):
+            return v   # already ISO, or unparseable
+    cur = conn.cursor()
+    rows = cur.execute("""
+        SELECT id, created_at, updated_at FROM tasks
+        WHERE created_at NOT GLOB ?1 OR updated_at NOT GLOB ?1
+    """, (ISO_GLOB,)).fetchall()
+    cur.executemany(
+        "UPDATE tasks SET created_at=?, updated_at=? WHERE id=?",
+        [(iso(a), iso(b), i) for i, a, b in rows]
+    )
+    conn.commit()
+
+# ================= SHARED QUERIES =================
+# Each takes a connection or cursor as its first argument.
+
+def fts_query(text):
+    """User text as an FTS5 query: every word must match, each as a prefix,
+    quoted so stray operators or quotes cannot break the MATCH syntax."""
+    return " ".join('"%s"*' % w.replace('"', '""') for w in text.split())
+
+def log_changes(conn, task_ids, actor, now, **fields):
+    """Appends a task_events row for each task in `task_ids` and each of
+    `fields` whose new value differs from the current one. Call it just
+    before the UPDATE, on the same connection and before commit, so the log
+    and the change land together."""
+    for f, v in fields.items():
+        conn.executemany(f"""
+            INSERT INTO task_events(task_id, actor_id, field, old, new, at)
+            SELECT id, ?, '{f}', {f}, ?, ? FROM tasks WHERE id=? AND {f} IS NOT ?
+        """, [(actor, v, now, task_id, v) for task_id in task_ids])
+
+def task_history(conn, task_id):
+    """Events for a task, oldest first, with user ids shown as names."""
+    return conn.execute("""
+        SELECT e.at, a.name, e.field, IFNULL(o.name, e.old), IFNULL(n.name, e.new)
+        FROM task_events e
+        LEFT JOIN users a ON a.id=e.actor_id
+        LEFT JOIN users o ON e.field GLOB '*_id' AND o.id=e.old
+        LEFT JOIN users n ON e.field GLOB '*_id' AND n.id=e.new
+        WHERE e.task_id=? ORDER BY e.id
+    """, (task_id,)).fetchall()
+
+EXPORT_FIELDS = ("id", "title", "model", "urgency", "engineer", "officer", "technician",
+                 "status", "progress", "created_at", "updated_at")
+
+def export_query(user_id=None, status=None, since=None, until=None):
+    """(sql, args) for every task of `user_id` (all tasks when None), oldest
+    first, optionally limited to one status and a created_at date range.
+    Rows are EXPORT_FIELDS."""
+    where, args = [], []
+    if user_id is not None:
+        where.append("t.id IN (" + " UNION ".join(f"SELECT id FROM tasks WHERE {col}=?" for col in ROLE_COLS) + ")")
+        args += [user_id] * len(ROLE_COLS)
+    if status:
+        where.append("t.status=?"); args.append(status)
+    if since:
+        where.append("t.created_at>=?"); args.append(since)
+    if until:
+        where.append("t.created_at<date(?,'+1 day')"); args.append(until)
+    return f"""
+        SELECT t.id, t.title, t.model, t.urgency, e.name, o.name, x.name,
+               t.status, t.progress, t.created_at, t.updated_at
+        FROM tasks t
+        LEFT JOIN users e ON e.id=t.engineer_id
+        LEFT JOIN users o ON o.id=t.officer_id
+        LEFT JOIN users x ON x.id=t.technician_id
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY t.id
+    """, args
@@ -0,0 +1,153 @@
+"""Statement timing and the slow-query log, shared by web_app and desktop_app.
+
+SLOW_QUERY_MS=50 logs every statement that takes 50 ms or more (executing
+plus reading its rows) with where it ran from, its parameter types and
+EXPLAIN QUERY PLAN to SLOW_QUERY_LOG, rotated at 5 MB. Processes append to
+the same file and rotation isn't coordinated between them; lines carry the
+pid.
+
+Each app subclasses TracedCursor to say where a statement ran from (the
+web app also counts statements and lock retries there) and connects with
+a TracedConnection whose cursor_class is that subclass.
+"""
+import logging.handlers, os, sqlite3, threading, time
+
+SLOW_QUERY_MS = float(os.environ["SLOW_QUERY_MS"]) if os.environ.get("SLOW_QUERY_MS") else None
+SLOW_QUERY_LOG = os.environ.get("SLOW_QUERY_LOG", "slow_queries.log")
+slow_log = logging.getLogger("daily_work.slow_query")
+if SLOW_QUERY_MS is not None and not slow_log.handlers:
+    _handler = logging.handlers.RotatingFileHandler(SLOW_QUERY_LOG, maxBytes=5 * 2**20, backupCount=5,
+                                                    encoding="utf-8")
+    _handler.setFormatter(logging.Formatter("%(asctime)s [%(process)d] %(message)s"))
+    slow_log.addHandler(_handler)
+    slow_log.propagate = False
+
+
+class TracedCursor(sqlite3.Cursor):
+    # execute() only steps to the first row; the rest is read by fetch*()
+    # or iteration, which count towards the statement's time
+    stmt = None   # [sql, params, seconds, lock wait, many] while rows are being read
+
+    def execute(self, sql, params=()):
+        return self._run(super().execute, sql, params)
+
+    def executemany(self, sql, seq):
+        if not isinstance(seq, list):
+            seq = list(seq)   # kept for the log
+        return self._run(super().executemany, sql, seq, True)
+
+    def fetchone(self):
+        return self._fetch(super().fetchone, done=True)
+
+    def fetchmany(self, size=None):
+        size = size or self.arraysize
+        rows = self._fetch(super().fetchmany, size)
+        if len(rows) < size:
+            self._done()
+        return rows
+
+    def fetchall(self):
+        return self._fetch(super().fetchall, done=True)
+
+    def __next__(self):
+        try:
+            return self._fetch(super().__next__)
+        except StopIteration:
+            self._done()
+            raise
+
+    # Hooks for the apps.
+    def call(self, fn, *args):
+        """Runs execute() or executemany() on the underlying cursor."""
+        return fn(*args)
+
+    def lock_wait(self):
+        """Seconds this thread has waited for locks so far."""
+        return 0.0
+
+    def fetched(self, seconds):
+        """Called with the time each fetch took."""
+
+    def caller(self):
+        """Where the statement ran from, for the log."""
+        return threading.current_thread().name
+
+    def _run(self, fn, sql, params, many=False):
+        self._done()
+        t, w = time.perf_counter(), self.lock_wait()
+        try:
+            return self.call(fn, sql, params)
+        finally:
+            self.stmt = [sql, params, time.perf_counter() - t, self.lock_wait() - w, many]
+            if self.description is None:   # no rows to read
+                self._done()
+
+    def _fetch(self, fn, *args, done=False):
+        t = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            took = time.perf_counter() - t
+            self.fetched(took)
+            if self.stmt:
+                self.stmt[2] += took
+            if done:
+                self._done()
+
+    def _done(self):
+        stmt, self.stmt = self.stmt, None
+        if stmt and SLOW_QUERY_MS is not None and stmt[2] * 1000 >= SLOW_QUERY_MS:
+            log_slow(self.connection, *stmt, self.caller())
+
+
+class TracedConnection(sqlite3.Connection):
+    cursor_class = TracedCursor
+
+    # sqlite3.Connection.execute() makes a plain Cursor, not self.cursor()
+    def cursor(self, factory=None):
+        return super().cursor(factory or self.cursor_class)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq):
+        return self.cursor().executemany(sql, seq)
+
+
+def param_shape(params):
+    """Types (and string lengths) of the parameters, never their values."""
+    def one(v):
+        if v is None:
+            return "NULL"
+        if isinstance(v, (str, bytes)):
+            return f"{type(v).__name__}[{len(v)}]"
+        return type(v).__name__
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}: {one(v)}" for k, v in params.items()) + "}"
+    return "(" + ", ".join(map(one, params)) + ")"
+
+def query_plan(conn, sql, params):
+    """EXPLAIN QUERY PLAN as an indented tree, or None if it can't be explained."""
+    if sql.lstrip().split(None, 1)[0].upper() not in ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE"):
+        return None
+    try:
+        rows = sqlite3.Cursor(conn).execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    except sqlite3.Error as e:
+        return f"  (no plan: {e})"
+    depth = {0: 0}
+    lines = []
+    for i, parent, _, detail in rows:
+        depth[i] = depth.get(parent, 0) + 1
+        lines.append("  " * depth[i] + detail)
+    return "\n".join(lines)
+
+def log_slow(conn, sql, params, seconds, waited, many, where):
+    shape = (f"{len(params)} x {param_shape(params[0])}" if params else "0 rows") if many else param_shape(params)
+    plan = query_plan(conn, sql, params[0] if many and params else params) if not many or params else None
+    # "SCAN t" with no index or virtual table after it reads the whole table
+    scans = [w[1] for w in map(str.split, (plan or "").splitlines())
+             if len(w) == 2 and w[0] == "SCAN" and not w[1].startswith("(")]
+    slow_log.warning("%.1f ms%s%s %s\n  %s\n  params %s%s", seconds * 1000,
+                     f" (lock wait {waited * 1000:.0f} ms)" if waited else "",
+                     f" full scan of {', '.join(scans)}" if scans else "", where,
+                     " ".join(sql.split()), shape, "\n" + plan if plan else "")
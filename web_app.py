@@ -1,286 +1,1057 @@
-from flask import Flask, render_template_string, request, redirect, session
-import sqlite3, hashlib
-from datetime import datetime
-import os
-
-app = Flask(__name__)
-app.secret_key = "daily-work-secret"
-DB = "daily_work.db"
-
-# ================= DATABASE =================
-def db():
-    return sqlite3.connect(DB)
-
-def hash_pw(p):
-    return hashlib.sha256(p.encode()).hexdigest()
-
-def init_db():
-    c = db()
-    cur = c.cursor()
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS users(
-        username TEXT PRIMARY KEY,
-        password_hash TEXT,
-        role TEXT,
-        name TEXT
-    )""")
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS tasks(
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        title TEXT,
-        model TEXT,
-        urgency TEXT,
-        engineer TEXT,
-        officer TEXT,
-        technician TEXT,
-        status TEXT,
-        progress INTEGER DEFAULT 0,
-        created_at TEXT,
-        updated_at TEXT
-    )""")
-    # default admin
-    cur.execute("INSERT OR IGNORE INTO users VALUES (?,?,?,?)",
-        ("admin", hash_pw("3624"), "admin", "System Admin"))
-    # default users
-    users = [
-        ("45213","45213","engineer","Engr. Sadid Hossain"),
-        ("41053","41053","engineer","Engr. Enamul Haque"),
-        ("38250","38250","officer","Md. Jahid Hasan"),
-        ("19359","19359","officer","Papon Chandra Das"),
-        ("6810","6810","technician","Selim"),
-    ]
-    for u,p,r,n in users:
-        cur.execute("INSERT OR IGNORE INTO users VALUES (?,?,?,?)",
-            (u,hash_pw(p),r,n))
-    c.commit()
-    c.close()
-
-# ================= HTML =================
-LOGIN_HTML = """
-<!doctype html>
-<html>
-<head>
-<title>Login</title>
-<style>
-body{background:#0b0f14;color:#39ff14;font-family:Consolas;text-align:center;padding-top:80px;}
-input{padding:8px;margin:6px;width:220px;}
-button{padding:8px 25px;background:#39ff14;border:none;font-weight:bold;}
-</style>
-</head>
-<body>
-<h2>Daily Work Update</h2>
-<form method="post">
-<input name="u" placeholder="User ID"><br>
-<input name="p" type="password" placeholder="Password"><br>
-<button>Login</button>
-</form>
-<p style="color:red">{{error}}</p>
-</body>
-</html>
-"""
-
-DASH_HTML = """
-<!doctype html>
-<html>
-<head>
-<title>Dashboard</title>
-<style>
-body{background:#0b0f14;color:#c9d1d9;font-family:Consolas;padding:15px;}
-h2,h3{color:#39ff14}
-table{border-collapse:collapse;width:100%;margin-top:10px}
-th,td{border:1px solid #39ff14;padding:6px;text-align:center}
-th{background:#161b22}
-input,select,button{padding:5px;margin:2px}
-button{background:#39ff14;border:none;font-weight:bold}
-a{color:#39ff14}
-</style>
-</head>
-<body>
-
-<h2>{{name}} ({{role}})</h2>
-<a href="/logout">Logout</a>
-
-{% if role=='admin' %}
-<h3>User Management</h3>
-<form method="post" action="/create_user">
-<input name="name" placeholder="Name">
-<input name="username" placeholder="Username">
-<input name="password" placeholder="Password">
-<select name="role">
-<option>admin</option>
-<option>engineer</option>
-<option>officer</option>
-<option>technician</option>
-</select>
-<button>Create</button>
-</form>
-
-<table>
-<tr><th>Name</th><th>User</th><th>Role</th><th>Action</th></tr>
-{% for u in users %}
-<tr>
-<td>{{u[3]}}</td><td>{{u[0]}}</td><td>{{u[2]}}</td>
-<td>
-<form method="post" action="/delete_user/{{u[0]}}">
-<button>Delete</button>
-</form>
-</td>
-</tr>
-{% endfor %}
-</table>
-{% endif %}
-
-{% if role=='engineer' %}
-<h3>Add Task</h3>
-<form method="post" action="/add_task">
-<input name="title" placeholder="Task Title">
-<select name="model">
-<option>12K</option><option>18K</option><option>24K</option>
-</select>
-<select name="urgency">
-<option>Regular</option><option>Urgent</option>
-</select>
-<select name="officer">
-{% for o in officers %}<option>{{o}}</option>{% endfor %}
-</select>
-<button>Add</button>
-</form>
-{% endif %}
-
-<h3>Tasks</h3>
-<table>
-<tr>
-<th>ID</th><th>Title</th><th>Model</th><th>Urgency</th>
-<th>Engineer</th><th>Officer</th><th>Technician</th>
-<th>Status</th><th>Progress</th><th>Action</th>
-</tr>
-
-{% for t in tasks %}
-<tr>
-<td>{{t[0]}}</td><td>{{t[1]}}</td><td>{{t[2]}}</td><td>{{t[3]}}</td>
-<td>{{t[4]}}</td><td>{{t[5]}}</td><td>{{t[6] or '-'}}</td>
-<td>{{t[7]}}</td><td>{{t[8]}}%</td>
-<td>
-
-{% if role=='officer' %}
-<form method="post" action="/assign_tech/{{t[0]}}">
-<select name="technician">
-{% for tech in technicians %}<option>{{tech}}</option>{% endfor %}
-</select>
-<button>Assign</button>
-</form>
-<a href="/update_status/{{t[0]}}/Running">Running</a>
-<a href="/update_status/{{t[0]}}/Completed">Done</a>
-
-{% elif role=='technician' %}
-<form method="post" action="/update_progress/{{t[0]}}">
-<input name="progress" type="number" value="{{t[8]}}" min="0" max="100">
-<button>Update</button>
-</form>
-{% endif %}
-
-</td>
-</tr>
-{% endfor %}
-</table>
-
-</body>
-</html>
-"""
-
-# ================= ROUTES =================
-@app.route("/", methods=["GET","POST"])
-def login():
-    err=""
-    if request.method=="POST":
-        u,p=request.form["u"],request.form["p"]
-        c=db();cur=c.cursor()
-        cur.execute("SELECT role,name FROM users WHERE username=? AND password_hash=?",(u,hash_pw(p)))
-        r=cur.fetchone();c.close()
-        if r:
-            session["u"]=u;session["r"]=r[0];session["n"]=r[1]
-            return redirect("/dashboard")
-        err="Invalid Login"
-    return render_template_string(LOGIN_HTML,error=err)
-
-@app.route("/dashboard")
-def dashboard():
-    if "u" not in session: return redirect("/")
-    r,n=session["r"],session["n"]
-    c=db();cur=c.cursor()
-    if r=="admin": cur.execute("SELECT * FROM tasks")
-    else: cur.execute("SELECT * FROM tasks WHERE engineer=? OR officer=? OR technician=?",(n,n,n))
-    tasks=cur.fetchall()
-    cur.execute("SELECT * FROM users"); users=cur.fetchall()
-    cur.execute("SELECT name FROM users WHERE role='officer'"); officers=[i[0] for i in cur.fetchall()]
-    cur.execute("SELECT name FROM users WHERE role='technician'"); technicians=[i[0] for i in cur.fetchall()]
-    c.close()
-    return render_template_string(DASH_HTML,role=r,name=n,users=users,tasks=tasks,officers=officers,technicians=technicians)
-
-# ================= ADMIN =================
-@app.route("/create_user",methods=["POST"])
-def create_user():
-    if session.get("r")!="admin": return redirect("/dashboard")
-    c=db();cur=c.cursor()
-    cur.execute("INSERT OR IGNORE INTO users VALUES (?,?,?,?)",
-        (request.form["username"],hash_pw(request.form["password"]),request.form["role"],request.form["name"]))
-    c.commit();c.close()
-    return redirect("/dashboard")
-
-@app.route("/delete_user/<u>",methods=["POST"])
-def delete_user(u):
-    if session.get("r")!="admin" or u=="admin": return redirect("/dashboard")
-    c=db();cur=c.cursor()
-    cur.execute("DELETE FROM users WHERE username=?",(u,))
-    c.commit();c.close()
-    return redirect("/dashboard")
-
-# ================= ENGINEER =================
-@app.route("/add_task",methods=["POST"])
-def add_task():
-    if session.get("r")!="engineer": return redirect("/dashboard")
-    now=datetime.now().strftime("%d-%b-%Y %I:%M %p")
-    c=db();cur=c.cursor()
-    cur.execute("""
-    INSERT INTO tasks(title,model,urgency,engineer,officer,status,created_at,updated_at)
-    VALUES (?,?,?,?,?,?,?,?)
-    """,(request.form["title"],request.form["model"],request.form["urgency"],session["n"],request.form["officer"],"Pending",now,now))
-    c.commit();c.close()
-    return redirect("/dashboard")
-
-# ================= OFFICER =================
-@app.route("/assign_tech/<int:i>",methods=["POST"])
-def assign_tech(i):
-    c=db();cur=c.cursor()
-    cur.execute("UPDATE tasks SET technician=? WHERE id=?",(request.form["technician"],i))
-    c.commit();c.close()
-    return redirect("/dashboard")
-
-@app.route("/update_status/<int:i>/<s>")
-def update_status(i,s):
-    c=db();cur=c.cursor()
-    cur.execute("UPDATE tasks SET status=? WHERE id=?",(s,i))
-    c.commit();c.close()
-    return redirect("/dashboard")
-
-# ================= TECHNICIAN =================
-@app.route("/update_progress/<int:i>",methods=["POST"])
-def update_progress(i):
-    p=int(request.form["progress"])
-    s="Completed" if p==100 else "Running"
-    c=db();cur=c.cursor()
-    cur.execute("UPDATE tasks SET progress=?,status=? WHERE id=?",(p,s,i))
-    c.commit();c.close()
-    return redirect("/dashboard")
-
-# ================= LOGOUT =================
-@app.route("/logout")
-def logout():
-    session.clear()
-    return redirect("/")
-
-# ================= RUN =================
-if __name__=="__main__":
-    init_db()
-    port = int(os.environ.get("PORT", 5000))
-    app.run(host="0.0.0.0", port=port)
+from flask import Flask, render_template, request, redirect, session, g, Response, stream_with_context, has_request_context
+from jinja2 import DictLoader
+import sqlite3, hashlib, threading, time, queue, json, csv, io, bisect
+import click
+from datetime import datetime
+from urllib.parse import urlencode
+import os
+import slow_query
+from schema import create_schema, ROLE_COLS, fts_query, log_changes, task_history, EXPORT_FIELDS, export_query
+
+app = Flask(__name__)
+app.secret_key = "daily-work-secret"
+DB = os.environ.get("DAILY_WORK_DB", "daily_work.db")
+
+# ================= DATABASE =================
+# One long-lived connection per worker thread, handed out through the app
+# context. WAL lets the dashboard read while an officer/technician writes.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-16000",  # ~16 MB page cache
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA foreign_keys=ON",
+)
+_local = threading.local()
+
+# With METRICS, SERVER_TIMING (see the METRICS section) or SLOW_QUERY_MS (see
+# slow_query.py) on, every statement is timed through TimedConnection;
+# otherwise connections are plain sqlite3 ones.
+METRICS = os.environ.get("METRICS") == "1"
+SERVER_TIMING = os.environ.get("SERVER_TIMING") == "1"
+LOCK_SLICE = 0.05   # busy timeout per attempt; each expiry is one counted retry
+LOCK_WAIT = 5.0     # total wait before "database is locked", as busy_timeout
+
+class SQLStats(threading.local):
+    """SQL work done by the current thread's request."""
+    queries = 0
+    seconds = 0.0
+    retries = 0
+    waited = 0.0
+_sql = SQLStats()
+
+def timed_sql(fn, *args):
+    t = time.perf_counter()
+    retried = False
+    try:
+        while True:
+            try: return fn(*args)
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) or time.perf_counter()-t >= LOCK_WAIT: raise
+                _sql.retries += 1; retried = True
+    finally:
+        took = time.perf_counter()-t
+        _sql.queries += 1; _sql.seconds += took
+        if retried: _sql.waited += took
+
+class TimedCursor(slow_query.TracedCursor):
+    # execute() only steps to the first row; the rest is read by fetch*()
+    # or iteration, which count towards SQL time but not as statements
+    def call(self, fn, *args): return timed_sql(fn, *args)
+    def lock_wait(self): return _sql.waited
+    def fetched(self, seconds): _sql.seconds += seconds
+    def caller(self):
+        return f"{request.method} {request.path}" if has_request_context() else super().caller()
+
+class TimedConnection(slow_query.TracedConnection):
+    cursor_class = TimedCursor
+    def commit(self): return timed_sql(super().commit)
+
+def connect():
+    timed = METRICS or SERVER_TIMING or slow_query.SLOW_QUERY_MS is not None
+    c = sqlite3.connect(DB, timeout=5, factory=TimedConnection if timed else sqlite3.Connection)
+    for p in PRAGMAS: c.execute(p)
+    # wait for locks in short slices so each retry can be counted
+    if timed: c.execute(f"PRAGMA busy_timeout={int(LOCK_SLICE*1000)}")
+    return c
+
+def db():
+    if "db" not in g:
+        # gunicorn forks workers after import; never reuse the parent's handle
+        if getattr(_local, "pid", None) != os.getpid():
+            _local.conn, _local.pid = connect(), os.getpid()
+        g.db = _local.conn
+    return g.db
+
+@app.teardown_appcontext
+def release_db(exc):
+    c = g.pop("db", None)
+    if c is not None and c.in_transaction: c.rollback()
+
+@app.errorhandler(sqlite3.OperationalError)
+def database_locked(e):
+    # a writer waited out the whole busy timeout: that's "try again", not a crash
+    if "locked" not in str(e): raise e
+    app.logger.warning("%s %s: %s",request.method,request.path,e)
+    return Response("database is locked, try again\n",503,{"Retry-After":"1"},mimetype="text/plain")
+
+def hash_pw(p):
+    return hashlib.sha256(p.encode()).hexdigest()
+
+# Timestamps are stored as local ISO-8601 so they sort and range-query in SQL.
+def stamp():
+    return datetime.now().isoformat(" ","seconds")
+
+def init_db():
+    c = connect()
+    # executescript() can't be retried halfway, so wait the whole busy
+    # timeout here even when connect() sliced it for lock-retry counting
+    c.execute(f"PRAGMA busy_timeout={int(LOCK_WAIT*1000)}")
+    create_schema(c)
+    cur = c.cursor()
+    # default admin
+    cur.execute("INSERT OR IGNORE INTO users(username,password_hash,role,name) VALUES (?,?,?,?)",
+        ("admin", hash_pw("3624"), "admin", "System Admin"))
+    # default users
+    users = [
+        ("45213","45213","engineer","Engr. Sadid Hossain"),
+        ("41053","41053","engineer","Engr. Enamul Haque"),
+        ("38250","38250","officer","Md. Jahid Hasan"),
+        ("19359","19359","officer","Papon Chandra Das"),
+        ("6810","6810","technician","Selim"),
+    ]
+    for u,p,r,n in users:
+        cur.execute("INSERT OR IGNORE INTO users(username,password_hash,role,name) VALUES (?,?,?,?)",
+            (u,hash_pw(p),r,n))
+    c.commit()
+    c.close()
+
+# ================= HTML =================
+LOGIN_HTML = """
+<!doctype html>
+<html>
+<head>
+<title>Login</title>
+<style>
+body{background:#0b0f14;color:#39ff14;font-family:Consolas;text-align:center;padding-top:80px;}
+input{padding:8px;margin:6px;width:220px;}
+button{padding:8px 25px;background:#39ff14;border:none;font-weight:bold;}
+</style>
+</head>
+<body>
+<h2>Daily Work Update</h2>
+<form method="post">
+<input name="u" placeholder="User ID"><br>
+<input name="p" type="password" placeholder="Password"><br>
+<button>Login</button>
+</form>
+<p style="color:red">{{error}}</p>
+</body>
+</html>
+"""
+
+DASH_HTML = """
+<!doctype html>
+<html>
+<head>
+<title>Dashboard</title>
+<style>
+body{background:#0b0f14;color:#c9d1d9;font-family:Consolas;padding:15px;}
+h2,h3{color:#39ff14}
+table{border-collapse:collapse;width:100%;margin-top:10px}
+th,td{border:1px solid #39ff14;padding:6px;text-align:center}
+th{background:#161b22}
+input,select,button{padding:5px;margin:2px}
+button{background:#39ff14;border:none;font-weight:bold}
+a{color:#39ff14}
+</style>
+</head>
+<body>
+
+<h2>{{name}} ({{role}})</h2>
+<a href="/logout">Logout</a>
+
+{% if role=='admin' %}{% include "_admin.html" %}{% endif %}
+{% if role=='engineer' %}{% include "_engineer.html" %}{% endif %}
+
+<h3>Tasks</h3>
+<form method="get" action="/dashboard">
+<input name="q" value="{{q}}" placeholder="Search titles">
+<select name="status"><option value="">Any status</option>
+{% for v in ("Pending","Running","Completed") %}<option{% if filters.status==v %} selected{% endif %}>{{v}}</option>{% endfor %}
+</select>
+<select name="urgency"><option value="">Any urgency</option>
+{% for v in ("Regular","Urgent") %}<option{% if filters.urgency==v %} selected{% endif %}>{{v}}</option>{% endfor %}
+</select>
+<select name="model"><option value="">Any model</option>
+{% for v in ("12K","18K","24K") %}<option{% if filters.model==v %} selected{% endif %}>{{v}}</option>{% endfor %}
+</select>
+<select name="sort">
+{% for v,label in (("newest","Newest"),("oldest","Oldest"),("updated","Recently updated")) %}<option value="{{v}}"{% if sort==v %} selected{% endif %}>{{label}}</option>{% endfor %}
+</select>
+<button>Apply</button>
+{% if q or filters or sort!="newest" %}<a href="/dashboard">Clear</a>{% endif %}
+</form>
+<p>Export: <a href="/export/tasks.csv">CSV</a> | <a href="/export/tasks.ndjson">NDJSON</a></p>
+{% if live %}<p id="live-new" style="display:none"><a href="/dashboard">New tasks &mdash; reload</a></p>{% endif %}
+{% include ["_tasks_" ~ role ~ ".html", "_tasks.html"] %}
+
+<p>
+{% if prev %}<a href="/dashboard?before={{prev}}&{{keep}}">&laquo; Previous</a>{% endif %}
+{% if next %}<a href="/dashboard?after={{next}}&{{keep}}">Next &raquo;</a>{% endif %}
+</p>
+
+{% if live %}
+<script>
+// live updates from /events: patch rows on this page, flag newer tasks
+var newest={{tasks[0][0] if tasks and not prev and not q and sort=="newest" else 0}};
+var es=new EventSource("/events");
+es.addEventListener("task",function(e){
+  var t=JSON.parse(e.data),tr=document.getElementById("task-"+t.id);
+  if(!tr){ if(newest && t.id>newest) document.getElementById("live-new").style.display="block"; return; }
+  var v=[t.id,t.title,t.model,t.urgency,t.engineer,t.officer,t.technician||"-",t.status,t.progress+"%"];
+  for(var i=1;i<v.length;i++) tr.cells[i].textContent=v[i];
+  var p=tr.querySelector("input[name=progress]"); if(p) p.value=t.progress;
+});
+es.addEventListener("delete",function(e){
+  var tr=document.getElementById("task-"+JSON.parse(e.data).id); if(tr) tr.remove();
+});
+</script>
+{% endif %}
+
+</body>
+</html>
+"""
+
+ADMIN_HTML = """
+<h3>User Management</h3>
+<form method="post" action="/create_user">
+<input name="name" placeholder="Name">
+<input name="username" placeholder="Username">
+<input name="password" placeholder="Password">
+<select name="role">
+<option>admin</option>
+<option>engineer</option>
+<option>officer</option>
+<option>technician</option>
+</select>
+<button>Create</button>
+</form>
+<p><a href="/report">Status report</a></p>
+
+<h3>Import Tasks</h3>
+<form method="post" action="/import_tasks" enctype="multipart/form-data">
+<input type="file" name="file" accept=".csv">
+<button>Import CSV</button>
+</form>
+
+<table>
+<tr><th>Name</th><th>User</th><th>Role</th><th>Action</th></tr>
+{% for u in users %}
+<tr>
+<td>{{u[1]}}</td><td>{{u[0]}}</td><td>{{u[2]}}</td>
+<td>
+<form method="post" action="/delete_user/{{u[0]}}">
+<button>Delete</button>
+</form>
+</td>
+</tr>
+{% endfor %}
+</table>
+"""
+
+ENGINEER_HTML = """
+<h3>Add Task</h3>
+<form method="post" action="/add_task">
+<input name="title" placeholder="Task Title">
+<select name="model">
+<option>12K</option><option>18K</option><option>24K</option>
+</select>
+<select name="urgency">
+<option>Regular</option><option>Urgent</option>
+</select>
+<select name="officer">
+{% for o in officers %}<option value="{{o[0]}}">{{o[1]}}</option>{% endfor %}
+</select>
+<button>Add</button>
+</form>
+"""
+
+# Layout of the standalone pages (report, history, import).
+PAGE_HTML = """
+<!doctype html>
+<html>
+<head>
+<title>{% block title %}{% endblock %}</title>
+<style>
+body{background:#0b0f14;color:#c9d1d9;font-family:Consolas;padding:15px;}
+h2,h3{color:#39ff14}
+table{border-collapse:collapse;width:100%;margin-top:10px}
+th,td{border:1px solid #39ff14;padding:6px;text-align:center}
+th{background:#161b22}
+a{color:#39ff14}
+</style>
+</head>
+<body>
+{% block body %}{% endblock %}
+</body>
+</html>
+"""
+
+REPORT_HTML = """{% extends "page.html" %}
+{% block title %}Report{% endblock %}
+{% block body %}
+
+<h2>Status Report</h2>
+<a href="/dashboard">Dashboard</a> | <a href="/logout">Logout</a>
+
+{% for role, rows in report|groupby(0) %}
+<h3>{{role|capitalize}}s</h3>
+<table>
+<tr><th>Name</th><th>Pending</th><th>Running</th><th>Completed</th></tr>
+{% for r in rows %}
+<tr><td>{{r[1]}}</td><td>{{r[2]}}</td><td>{{r[3]}}</td><td>{{r[4]}}</td></tr>
+{% endfor %}
+</table>
+{% else %}
+<p>No tasks yet.</p>
+{% endfor %}
+
+{% endblock %}
+"""
+
+HISTORY_HTML = """{% extends "page.html" %}
+{% block title %}Task {{task_id}} History{% endblock %}
+{% block body %}
+
+<h2>Task {{task_id}} History</h2>
+<a href="/dashboard">Dashboard</a> | <a href="/logout">Logout</a>
+
+<table>
+<tr><th>Time</th><th>By</th><th>Field</th><th>From</th><th>To</th></tr>
+{% for e in events %}
+<tr><td>{{e[0]}}</td><td>{{e[1] or '-'}}</td><td>{{e[2]|replace('_id','')}}</td><td>{{e[3] if e[3] is not none else '-'}}</td><td>{{e[4] if e[4] is not none else '-'}}</td></tr>
+{% else %}
+<tr><td colspan="5">No changes recorded.</td></tr>
+{% endfor %}
+</table>
+
+{% endblock %}
+"""
+
+IMPORT_HTML = """{% extends "page.html" %}
+{% block title %}Import{% endblock %}
+{% block body %}
+
+<h2>Import: {{imported}} imported, {{rejected|length}} rejected</h2>
+<a href="/dashboard">Dashboard</a>
+
+{% if rejected %}
+<table>
+<tr><th>Line</th><th>Reason</th></tr>
+{% for line, reason in rejected[:500] %}
+<tr><td>{{line}}</td><td>{{reason}}</td></tr>
+{% endfor %}
+</table>
+{% if rejected|length > 500 %}<p>&hellip; and {{rejected|length - 500}} more</p>{% endif %}
+{% endif %}
+
+{% endblock %}
+"""
+
+# Task table pieces shared by the per-role tables below.
+TASK_ROW_HTML = """
+{% macro head() %}
+<tr>
+<th>ID</th><th>Title</th><th>Model</th><th>Urgency</th>
+<th>Engineer</th><th>Officer</th><th>Technician</th>
+<th>Status</th><th>Progress</th><th>Action</th>
+</tr>
+{% endmacro %}
+
+{% macro cells(t) %}
+<td><a href="/task/{{t[0]}}/history">{{t[0]}}</a></td><td>{{t[1]}}</td><td>{{t[2]}}</td><td>{{t[3]}}</td>
+<td>{{t[4]}}</td><td>{{t[5]}}</td><td>{{t[6] or '-'}}</td>
+<td>{{t[7]}}</td><td>{{t[8]}}%</td>
+{% endmacro %}
+"""
+
+TASKS_HTML = """{% from "_task_row.html" import head, cells %}
+<table>
+{{head()}}
+{% for t in tasks %}
+<tr id="task-{{t[0]}}">{{cells(t)}}<td></td></tr>
+{% endfor %}
+</table>
+"""
+
+OFFICER_TASKS_HTML = """{% from "_task_row.html" import head, cells %}
+{% set tech_options %}{% for tech in technicians %}<option value="{{tech[0]}}">{{tech[1]}}</option>{% endfor %}{% endset %}
+<form id="bulk" method="post" action="/bulk_tasks">
+<label><input type="checkbox" onclick="for(var b of document.querySelectorAll('input[name=ids]'))b.checked=this.checked"> All</label>
+<select name="technician">{{tech_options}}</select>
+<button name="action" value="assign">Assign checked</button>
+<button name="action" value="Running">Checked &rarr; Running</button>
+<button name="action" value="Completed">Checked &rarr; Done</button>
+</form>
+<table>
+{{head()}}
+{% for t in tasks %}
+<tr id="task-{{t[0]}}">{{cells(t)}}
+<td>
+<input type="checkbox" name="ids" value="{{t[0]}}" form="bulk">
+<form method="post" action="/assign_tech/{{t[0]}}">
+<select name="technician">{{tech_options}}</select>
+<button>Assign</button>
+</form>
+<a href="/update_status/{{t[0]}}/Running">Running</a>
+<a href="/update_status/{{t[0]}}/Completed">Done</a>
+</td>
+</tr>
+{% endfor %}
+</table>
+"""
+
+TECHNICIAN_TASKS_HTML = """{% from "_task_row.html" import head, cells %}
+<table>
+{{head()}}
+{% for t in tasks %}
+<tr id="task-{{t[0]}}">{{cells(t)}}
+<td>
+<form method="post" action="/update_progress/{{t[0]}}">
+<input name="progress" type="number" value="{{t[8]}}" min="0" max="100">
+<button>Update</button>
+</form>
+</td>
+</tr>
+{% endfor %}
+</table>
+"""
+
+# Compiled once by Flask's Jinja environment and cached; partials compile on
+# first use, and are only re-checked for changes when TEMPLATES_AUTO_RELOAD
+# (on by default in debug) is set.
+TEMPLATES = {
+    "login.html": LOGIN_HTML,
+    "dashboard.html": DASH_HTML,
+    "_admin.html": ADMIN_HTML,
+    "_engineer.html": ENGINEER_HTML,
+    "page.html": PAGE_HTML,
+    "report.html": REPORT_HTML,
+    "history.html": HISTORY_HTML,
+    "import.html": IMPORT_HTML,
+    "_task_row.html": TASK_ROW_HTML,
+    "_tasks.html": TASKS_HTML,
+    "_tasks_officer.html": OFFICER_TASKS_HTML,
+    "_tasks_technician.html": TECHNICIAN_TASKS_HTML,
+}
+app.jinja_loader = DictLoader(TEMPLATES)
+
+# ================= QUERIES =================
+TASK_SELECT = """
+    SELECT t.id,t.title,t.model,t.urgency,e.name,o.name,x.name,t.status,t.progress,t.updated_at,t.version
+    FROM tasks t
+    LEFT JOIN users e ON e.id=t.engineer_id
+    LEFT JOIN users o ON o.id=t.officer_id
+    LEFT JOIN users x ON x.id=t.technician_id"""
+PAGE_SIZE = int(os.environ.get("PAGE_SIZE", 50))
+
+# equality filters the task list accepts (?status=Pending&urgency=Urgent...)
+FILTERS = ("status","urgency","model")
+# ?sort= name -> (key column, direction, position of the key in a TASK_SELECT
+# row). Keys are unique, so they double as keyset cursors; "updated" uses the
+# trigger-maintained row version, which every write bumps.
+SORTS = {"newest":("id","DESC",0),"oldest":("id","ASC",0),"updated":("version","DESC",10)}
+
+def task_filters(args):
+    return {f:args[f] for f in FILTERS if args.get(f)}
+
+def task_page(cur, r, uid, after=None, before=None, size=PAGE_SIZE, filters=None, sort="newest"):
+    """One keyset page of the tasks visible to role r / user id uid, in SORTS
+    order (newest first by default), narrowed by the `filters` dict.
+
+    Returns (rows, prev, next) where prev/next are the sort keys to pass back
+    as ?before= / ?after=, or None at either end. Non-admin scope is a UNION
+    of per-column index lookups (instead of an OR across the three role
+    columns), each bounded by the page size so the cost does not grow with
+    the user's history; filters go into every leg, where the
+    (role column, status) indexes serve them."""
+    filters=filters or {}
+    key,order,k=SORTS.get(sort,SORTS["newest"])
+    rev="ASC" if order=="DESC" else "DESC"
+    if before is not None: op,args,order=(">" if order=="DESC" else "<"),(before,),rev
+    elif after is not None: op,args=("<" if order=="DESC" else ">"),(after,)
+    else: op,args=None,()
+    def where(p=""):
+        conds=[f"{p}{f}=?" for f in filters]+([f"{p}{key}{op}?"] if op else [])
+        return "".join(" AND "+c for c in conds)
+    fargs=(*filters.values(),*args)
+    if r=="admin":
+        cur.execute(f"{TASK_SELECT} WHERE 1{where('t.')} ORDER BY t.{key} {order} LIMIT ?",(*fargs,size+1))
+    else:
+        legs=" UNION ".join(
+            f"SELECT id FROM (SELECT id FROM tasks WHERE {col}=?{where()} ORDER BY {key} {order} LIMIT ?)"
+            for col in ROLE_COLS)
+        cur.execute(f"{TASK_SELECT} WHERE t.id IN ({legs}) ORDER BY t.{key} {order} LIMIT ?",
+            (*(uid,*fargs,size+1)*len(ROLE_COLS),size+1))
+    rows=cur.fetchall()
+    more=len(rows)>size; rows=rows[:size]
+    if before is not None:
+        rows.reverse()
+        return rows,(rows[0][k] if more else None),(rows[-1][k] if rows else None)
+    return rows,(rows[0][k] if after is not None and rows else None),(rows[-1][k] if more else None)
+
+def task_changes(cur, r, uid, since=-1, limit=500):
+    """Tasks visible to role r / user uid written after version `since`,
+    oldest change first, plus ids deleted since then.
+
+    Returns (rows, deleted, version, more): pass `version` back as the next
+    `since`; `more` means the batch was cut at `limit`. Deleted ids are not
+    role-scoped (the row is gone), so clients ignore ids they never had."""
+    upto=cur.execute("SELECT value FROM counters WHERE name='tasks'").fetchone()[0]
+    # unary + keeps the planner on idx_tasks_version, so cost follows churn
+    scope="" if r=="admin" else " AND (+t.engineer_id=?1 OR +t.officer_id=?1 OR +t.technician_id=?1)"
+    cur.execute(f"{TASK_SELECT} WHERE t.version>?2 AND t.version<=?3{scope} ORDER BY t.version LIMIT ?4",
+        (uid,since,upto,limit+1))
+    rows=cur.fetchall()
+    more=len(rows)>limit; rows=rows[:limit]
+    if more: upto=rows[-1][-1]
+    cur.execute("SELECT task_id FROM task_tombstones WHERE version>? AND version<=? ORDER BY version",(since,upto))
+    return rows,[i[0] for i in cur.fetchall()],upto,more
+
+RANK_MAX = 5000
+
+def task_search(cur, r, uid, q, size=PAGE_SIZE, filters=None):
+    """Top `size` tasks visible to role r / user uid whose title matches q,
+    best bm25 rank first. Served from tasks_fts, so no title scan.
+
+    bm25 has to score every hit, which is ~0.5 s for a word that 100k titles
+    share (and ranks them all alike), so past RANK_MAX hits the newest
+    matches are shown instead, read straight off the index in rowid order."""
+    m=fts_query(q)
+    hits=cur.execute("SELECT count(*) FROM (SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ? LIMIT ?)",
+        (m,RANK_MAX+1)).fetchone()[0]
+    order="f.rank" if hits<=RANK_MAX else "f.rowid DESC"
+    scope="" if r=="admin" else " AND ? IN (t.engineer_id,t.officer_id,t.technician_id)"
+    filters=filters or {}
+    narrow="".join(f" AND t.{f}=?" for f in filters)
+    cur.execute(f"{TASK_SELECT} JOIN tasks_fts f ON f.rowid=t.id WHERE tasks_fts MATCH ?{scope}{narrow} ORDER BY {order} LIMIT ?",
+        (m,*(() if r=="admin" else (uid,)),*filters.values(),size))
+    return cur.fetchall()
+
+def status_report(cur):
+    """(role, name, pending, running, completed) per user from the trigger-
+    maintained task_status_counts: O(users), whatever the size of tasks."""
+    cur.execute("""
+    SELECT c.role,u.name,
+    SUM(CASE c.status WHEN 'Pending' THEN c.n ELSE 0 END),
+    SUM(CASE c.status WHEN 'Running' THEN c.n ELSE 0 END),
+    SUM(CASE c.status WHEN 'Completed' THEN c.n ELSE 0 END)
+    FROM task_status_counts c JOIN users u ON u.id=c.user_id
+    GROUP BY c.role,c.user_id HAVING SUM(c.n)>0
+    ORDER BY c.role,u.name
+    """)
+    return cur.fetchall()
+
+# ================= ROSTER CACHE =================
+# (id,name) of active users per role, for the officer/technician pickers.
+# create_user/delete_user clear it; other gunicorn workers catch up within
+# ROSTER_TTL seconds.
+ROSTER_TTL = 60
+_roster = {}
+
+def roster(role):
+    hit=_roster.get(role)
+    if hit and hit[0]>time.monotonic(): return hit[1]
+    rows=db().execute("SELECT id,name FROM users WHERE role=? AND username IS NOT NULL ORDER BY id",(role,)).fetchall()
+    _roster[role]=(time.monotonic()+ROSTER_TTL,rows)
+    return rows
+
+def invalidate_roster():
+    _roster.clear()
+
+# ================= ROUTES =================
+@app.route("/", methods=["GET","POST"])
+def login():
+    err=""
+    if request.method=="POST":
+        u,p=request.form["u"],request.form["p"]
+        c=db();cur=c.cursor()
+        cur.execute("SELECT id,role,name FROM users WHERE username=? AND password_hash=?",(u,hash_pw(p)))
+        r=cur.fetchone()
+        if r:
+            session["u"]=u;session["id"]=r[0];session["r"]=r[1];session["n"]=r[2]
+            return redirect("/dashboard")
+        err="Invalid Login"
+    return render_template("login.html",error=err)
+
+@app.route("/dashboard")
+def dashboard():
+    if "id" not in session: return redirect("/")
+    r,n=session["r"],session["n"]
+    size=min(max(request.args.get("size",PAGE_SIZE,type=int),1),500)
+    q=request.args.get("q","").strip()
+    filters,sort=task_filters(request.args),request.args.get("sort","newest")
+    c=db();cur=c.cursor()
+    if q:
+        tasks,prev,nxt=task_search(cur,r,session["id"],q,size,filters),None,None
+    else:
+        tasks,prev,nxt=task_page(cur,r,session["id"],request.args.get("after",type=int),request.args.get("before",type=int),size,
+            filters,sort)
+    # filters/sort/size carried over to the Newer/Older links
+    keep=urlencode({**filters,**({"sort":sort} if sort!="newest" else {}),"size":size})
+    users=cur.execute("SELECT username,name,role FROM users WHERE username IS NOT NULL").fetchall() if r=="admin" else []
+    officers=roster("officer") if r=="engineer" else []
+    technicians=roster("technician") if r=="officer" else []
+    return render_template("dashboard.html",role=r,name=n,users=users,tasks=tasks,officers=officers,technicians=technicians,
+        prev=prev,next=nxt,size=size,q=q,filters=filters,sort=sort,keep=keep,live=LIVE_EVENTS)
+
+# ================= ADMIN =================
+@app.route("/create_user",methods=["POST"])
+def create_user():
+    if session.get("r")!="admin": return redirect("/dashboard")
+    c=db();cur=c.cursor()
+    cur.execute("INSERT OR IGNORE INTO users(username,password_hash,role,name) VALUES (?,?,?,?)",
+        (request.form["username"],hash_pw(request.form["password"]),request.form["role"],request.form["name"]))
+    c.commit();invalidate_roster()
+    return redirect("/dashboard")
+
+@app.route("/delete_user/<u>",methods=["POST"])
+def delete_user(u):
+    if session.get("r")!="admin" or u=="admin": return redirect("/dashboard")
+    c=db();cur=c.cursor()
+    # tasks keep pointing at the row, so only the login goes away
+    cur.execute("UPDATE users SET username=NULL,password_hash=NULL WHERE username=?",(u,))
+    c.commit();invalidate_roster()
+    return redirect("/dashboard")
+
+@app.route("/report")
+def report():
+    if session.get("r")!="admin": return redirect("/dashboard")
+    etag=counter_etag("tasks","users")
+    if request.if_none_match.contains(etag):
+        return "",304,{"ETag":f'"{etag}"'}
+    resp=app.make_response(render_template("report.html",report=status_report(db().cursor())))
+    resp.set_etag(etag)
+    return resp
+
+# ================= ENGINEER =================
+@app.route("/add_task",methods=["POST"])
+def add_task():
+    if session.get("r")!="engineer": return redirect("/dashboard")
+    now=stamp()
+    c=db();cur=c.cursor()
+    cur.execute("""
+    INSERT INTO tasks(title,model,urgency,engineer_id,officer_id,status,created_at,updated_at)
+    VALUES (?,?,?,?,?,?,?,?)
+    """,(request.form["title"],request.form["model"],request.form["urgency"],session["id"],int(request.form["officer"]),"Pending",now,now))
+    cur.execute("INSERT INTO task_events(task_id,actor_id,field,old,new,at) VALUES (?,?,'status',NULL,'Pending',?)",
+        (cur.lastrowid,session["id"],now))
+    c.commit()
+    return redirect("/dashboard")
+
+# ================= OFFICER =================
+@app.route("/assign_tech/<int:i>",methods=["POST"])
+def assign_tech(i):
+    t,now=int(request.form["technician"]),stamp()
+    c=db();cur=c.cursor()
+    log_changes(cur,[i],session.get("id"),now,technician_id=t)
+    cur.execute("UPDATE tasks SET technician_id=?,updated_at=? WHERE id=?",(t,now,i))
+    c.commit()
+    return redirect("/dashboard")
+
+@app.route("/update_status/<int:i>/<s>")
+def update_status(i,s):
+    now=stamp()
+    c=db();cur=c.cursor()
+    log_changes(cur,[i],session.get("id"),now,status=s)
+    cur.execute("UPDATE tasks SET status=?,updated_at=? WHERE id=?",(s,now,i))
+    c.commit()
+    return redirect("/dashboard")
+
+@app.route("/bulk_tasks",methods=["POST"])
+def bulk_tasks():
+    """One officer action over every checked task: a single transaction,
+    commit and redirect instead of one round trip per task."""
+    if session.get("r")!="officer": return redirect("/dashboard")
+    action,now=request.form.get("action"),stamp()
+    c=db();cur=c.cursor()
+    # only the officer's own tasks, whatever ids were posted
+    ids=[r[0] for r in cur.execute(
+        "SELECT id FROM tasks WHERE officer_id=? AND id IN (SELECT value FROM json_each(?))",
+        (session["id"],json.dumps(request.form.getlist("ids",type=int))))]
+    if action=="assign" and request.form.get("technician"):
+        t=int(request.form["technician"])
+        log_changes(cur,ids,session["id"],now,technician_id=t)
+        cur.executemany("UPDATE tasks SET technician_id=?,updated_at=? WHERE id=?",[(t,now,i) for i in ids])
+    elif action in STATUSES:
+        log_changes(cur,ids,session["id"],now,status=action)
+        cur.executemany("UPDATE tasks SET status=?,updated_at=? WHERE id=?",[(action,now,i) for i in ids])
+    c.commit()
+    return redirect("/dashboard")
+
+# ================= TECHNICIAN =================
+@app.route("/update_progress/<int:i>",methods=["POST"])
+def update_progress(i):
+    p=int(request.form["progress"])
+    s="Completed" if p==100 else "Running"
+    now=stamp()
+    c=db();cur=c.cursor()
+    log_changes(cur,[i],session.get("id"),now,progress=p,status=s)
+    cur.execute("UPDATE tasks SET progress=?,status=?,updated_at=? WHERE id=?",(p,s,now,i))
+    c.commit()
+    return redirect("/dashboard")
+
+# ================= IMPORT =================
+# CSV columns: title, engineer and officer (usernames) are required;
+# model, urgency, technician, status and progress are optional.
+IMPORT_BATCH = int(os.environ.get("IMPORT_BATCH", 1000))
+STATUSES = ("Pending","Running","Completed")
+
+def import_tasks(c, lines, actor=None, batch=IMPORT_BATCH):
+    """Streams CSV rows from `lines` into tasks, `batch` rows per executemany
+    and commit, so memory and write-lock time stay bounded whatever the file
+    size. Returns (imported, [(line, reason), ...]) for the rejected rows;
+    a file that can't be read to the end keeps the rows before the failure
+    and reports the line it stopped at."""
+    cur=c.cursor()
+    users={u:(i,r) for i,u,r in cur.execute("SELECT id,username,role FROM users WHERE username IS NOT NULL")}
+    def user(row,role,required=True):
+        u=(row.get(role) or "").strip()
+        if not u and not required: return None
+        i,r=users.get(u,(None,None))
+        if r!=role: raise ValueError(f"unknown {role} {u!r}")
+        return i
+    reader=csv.DictReader(lines)
+    imported,rejected,rows=0,[],[]
+    def unreadable(e):
+        # a line that isn't UTF-8 (a cp1252 spreadsheet export) or isn't CSV
+        # fails partway through; earlier batches are already committed, so
+        # stop there and say so rather than fail the whole upload
+        why="not UTF-8 text (save it as CSV UTF-8)" if isinstance(e,UnicodeDecodeError) else f"bad CSV: {e}"
+        rejected.append((reader.line_num+1,why+"; this and later lines were not imported"))
+    def read():
+        try: yield from reader
+        except (UnicodeDecodeError,csv.Error) as e: unreadable(e)
+    try: fields=reader.fieldnames
+    except (UnicodeDecodeError,csv.Error) as e:
+        unreadable(e); return 0,rejected
+    missing={"title","engineer","officer"}-set(fields or ())
+    if missing: return 0,[(1,"missing column(s): "+", ".join(sorted(missing)))]
+    def flush():
+        # ids are handed out consecutively inside the write transaction, so
+        # the creation events come from one INSERT...SELECT past the old max;
+        # take the write lock first so no other writer's rows land past it
+        if not c.in_transaction: cur.execute("BEGIN IMMEDIATE")
+        last=cur.execute("SELECT IFNULL(max(id),0) FROM tasks").fetchone()[0]
+        cur.executemany("""
+        INSERT INTO tasks(title,model,urgency,engineer_id,officer_id,technician_id,status,progress,created_at,updated_at)
+        VALUES (?,?,?,?,?,?,?,?,?,?)""",rows)
+        cur.execute("""
+        INSERT INTO task_events(task_id,actor_id,field,old,new,at)
+        SELECT id,?,'status',NULL,status,created_at FROM tasks WHERE id>?""",(actor,last))
+        c.commit()
+        rows.clear()
+    for row in read():
+        try:
+            title=(row.get("title") or "").strip()
+            if not title: raise ValueError("empty title")
+            status=(row.get("status") or "").strip() or "Pending"
+            if status not in STATUSES: raise ValueError(f"bad status {status!r}")
+            progress=int((row.get("progress") or "").strip() or 0)
+            if not 0<=progress<=100: raise ValueError(f"progress {progress} out of range")
+            now=stamp()
+            rows.append((title,(row.get("model") or "").strip(),(row.get("urgency") or "").strip() or "Regular",
+                user(row,"engineer"),user(row,"officer"),user(row,"technician",False),status,progress,now,now))
+        except ValueError as e:
+            rejected.append((reader.line_num,str(e)))
+            continue
+        if len(rows)>=batch:
+            imported+=len(rows); flush()
+    if rows:
+        imported+=len(rows); flush()
+    return imported,rejected
+
+def csv_lines(f):
+    """Decodes a binary file as UTF-8 one line at a time, so a byte that
+    isn't UTF-8 fails on its own line rather than somewhere in an 8 KB chunk.
+    Lines are split as latin-1, which maps bytes 1:1; CR and LF never occur
+    inside a UTF-8 sequence, so any line ending (LF, CRLF, CR) works."""
+    for n,line in enumerate(io.TextIOWrapper(f,encoding="latin-1",newline="")):
+        yield line.encode("latin-1").decode("utf-8-sig" if n==0 else "utf-8")
+
+@app.route("/import_tasks",methods=["POST"])
+def import_tasks_upload():
+    if session.get("r")!="admin": return redirect("/dashboard")
+    f=request.files.get("file")
+    if not f: return redirect("/dashboard")
+    batch=max(request.form.get("batch",IMPORT_BATCH,type=int),1)
+    # read straight off the upload stream; the file is never held in memory
+    imported,rejected=import_tasks(db(),csv_lines(f.stream),session["id"],batch)
+    return render_template("import.html",imported=imported,rejected=rejected)
+
+@app.cli.command("import-tasks")
+@click.argument("path",type=click.Path(exists=True,dir_okay=False))
+@click.option("--batch-size",default=IMPORT_BATCH,show_default=True,help="Rows per transaction.")
+def import_tasks_command(path,batch_size):
+    """Bulk-import tasks from a CSV file."""
+    init_db()
+    c=connect()
+    t=time.perf_counter()
+    with open(path,"rb") as f:
+        imported,rejected=import_tasks(c,csv_lines(f),batch=max(batch_size,1))
+    c.close()
+    for line,reason in rejected:
+        click.echo(f"line {line}: {reason}",err=True)
+    click.echo(f"imported {imported}, rejected {len(rejected)} in {time.perf_counter()-t:.1f}s")
+
+# ================= EXPORT =================
+EXPORT_CHUNK = int(os.environ.get("EXPORT_CHUNK", 500))
+
+def export_chunks(cur, fmt):
+    """Text for an executed export cursor, EXPORT_CHUNK rows per piece, so
+    memory stays flat however many rows the cursor walks."""
+    if fmt=="csv":
+        buf=io.StringIO(); w=csv.writer(buf); w.writerow(EXPORT_FIELDS)
+    while True:
+        rows=cur.fetchmany(EXPORT_CHUNK)
+        if fmt=="csv":
+            w.writerows(rows)
+            if buf.tell(): yield buf.getvalue()
+            buf.seek(0); buf.truncate()
+        elif rows:
+            yield "".join(json.dumps(dict(zip(EXPORT_FIELDS,r)))+"\n" for r in rows)
+        if not rows: break
+
+@app.route("/export/tasks.<fmt>")
+def export_tasks(fmt):
+    if "id" not in session: return redirect("/")
+    if fmt not in ("csv","ndjson"): return "",404
+    sql,args=export_query(None if session["r"]=="admin" else session["id"],request.args.get("status"),
+        request.args.get("from"),request.args.get("to"))
+    cur=db().cursor(); cur.execute(sql,args)
+    return Response(stream_with_context(export_chunks(cur,fmt)),
+        mimetype="text/csv" if fmt=="csv" else "application/x-ndjson",
+        headers={"Content-Disposition":f"attachment; filename=tasks.{fmt}"})
+
+# ================= HISTORY =================
+@app.route("/task/<int:i>/history")
+def history(i):
+    if "id" not in session: return redirect("/")
+    cur=db().cursor()
+    if session["r"]!="admin" and not cur.execute(
+        "SELECT 1 FROM tasks WHERE id=? AND ? IN (engineer_id,officer_id,technician_id)",(i,session["id"])).fetchone():
+        return redirect("/dashboard")
+    return render_template("history.html",task_id=i,events=task_history(cur,i))
+
+# ================= API =================
+TASK_FIELDS = ("id","title","model","urgency","engineer","officer","technician","status","progress","updated_at","version")
+
+def counter_etag(*names):
+    """Strong ETag for the current user's view of the given tables: changes
+    whenever one of their counters moves or the scope/query string differs."""
+    vals=db().execute(f"SELECT name,value FROM counters WHERE name IN ({','.join('?'*len(names))}) ORDER BY name",names).fetchall()
+    key=f"{vals}|{session['id']}|{request.path}?{request.query_string.decode()}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+@app.route("/api/tasks")
+def api_tasks():
+    if "id" not in session: return {"error":"login required"},401
+    etag=counter_etag("tasks","users")
+    if request.if_none_match.contains(etag):
+        return "",304,{"ETag":f'"{etag}"'}
+    size=min(max(request.args.get("size",PAGE_SIZE,type=int),1),500)
+    rows,prev,nxt=task_page(db().cursor(),session["r"],session["id"],
+        request.args.get("after",type=int),request.args.get("before",type=int),size,
+        task_filters(request.args),request.args.get("sort","newest"))
+    resp=app.json.response({"tasks":[dict(zip(TASK_FIELDS,t)) for t in rows],"prev":prev,"next":nxt})
+    resp.set_etag(etag)
+    return resp
+
+@app.route("/api/tasks/changes")
+def api_task_changes():
+    if "id" not in session: return {"error":"login required"},401
+    limit=min(max(request.args.get("limit",500,type=int),1),5000)
+    rows,deleted,version,more=task_changes(db().cursor(),session["r"],session["id"],
+        request.args.get("since",-1,type=int),limit)
+    return {"tasks":[dict(zip(TASK_FIELDS,t)) for t in rows],"deleted":deleted,"version":version,"more":more}
+
+# ================= EVENTS =================
+# Server-Sent Events push of task writes. Each worker process runs one
+# watcher thread that polls the tasks change counter (so writes from other
+# gunicorn workers and the desktop app are seen too) and fans the changed
+# rows out to its subscribers' queues.
+#
+# An open stream holds a worker thread, so dashboards only subscribe when
+# LIVE_EVENTS=1, meaning the server has threads to spare, e.g.
+#   LIVE_EVENTS=1 gunicorn -k gthread --threads 50 web_app:app
+# Streams still end after EVENTS_MAX_AGE seconds; EventSource reconnects
+# with Last-Event-ID and gets what it missed, so no thread is held for good.
+LIVE_EVENTS = os.environ.get("LIVE_EVENTS") == "1"
+EVENTS_POLL = float(os.environ.get("EVENTS_POLL", 0.5))
+EVENTS_MAX_AGE = float(os.environ.get("EVENTS_MAX_AGE", 20))
+_subscribers = {}   # queue -> (role, user id)
+_watcher = {"pid": None}
+_watcher_lock = threading.Lock()
+
+def sse(event, data, id=None):
+    return (f"id: {id}\n" if id is not None else "")+f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def subscribe(r, uid):
+    q=queue.Queue(maxsize=1000)
+    with _watcher_lock:
+        _subscribers[q]=(r,uid)
+        if _watcher["pid"]!=os.getpid():
+            _watcher["pid"]=os.getpid()
+            threading.Thread(target=watch_tasks,name="task-events",daemon=True).start()
+    return q
+
+def unsubscribe(q):
+    with _watcher_lock: _subscribers.pop(q,None)
+
+def publish(cur, rows, deleted, version):
+    """Queue task/delete events for every subscriber allowed to see them."""
+    if not rows and not deleted: return
+    with _watcher_lock: subs=list(_subscribers.items())
+    owners={}
+    if rows:
+        ids=[t[0] for t in rows]
+        owners={i:set(o) for i,*o in cur.execute(
+            f"SELECT id,engineer_id,officer_id,technician_id FROM tasks WHERE id IN ({','.join('?'*len(ids))})",ids)}
+    for q,(r,uid) in subs:
+        evs=[sse("task",dict(zip(TASK_FIELDS,t)),t[-1]) for t in rows if r=="admin" or uid in owners.get(t[0],())]
+        evs+=[sse("delete",{"id":i},version) for i in deleted]
+        for ev in evs:
+            try: q.put_nowait(ev)
+            except queue.Full: break  # stalled client; it resyncs on reconnect
+
+def watch_tasks():
+    cur=connect().cursor()
+    since=None
+    while True:
+        try:
+            v=cur.execute("SELECT value FROM counters WHERE name='tasks'").fetchone()[0]
+            if since is None or not _subscribers: since=v
+            more=v!=since
+            while more:
+                rows,deleted,since,more=task_changes(cur,"admin",None,since)
+                publish(cur,rows,deleted,since)
+        except Exception:
+            # keep watching: a locked or busy file must not silence every stream
+            app.logger.exception("task event watcher")
+        time.sleep(EVENTS_POLL)
+
+@app.route("/events")
+def events():
+    if "id" not in session: return "",401
+    r,uid=session["r"],session["id"]
+    last=request.headers.get("Last-Event-ID",type=int)
+    def stream():
+        q=subscribe(r,uid)
+        try:
+            yield "retry: 3000\n\n"
+            cur=db().cursor()
+            if last is None:
+                version=cur.execute("SELECT value FROM counters WHERE name='tasks'").fetchone()[0]
+            else:
+                # reconnect: replay what this user missed while disconnected
+                rows,deleted,version,more=task_changes(cur,r,uid,last)
+                yield from (sse("task",dict(zip(TASK_FIELDS,t)),t[-1]) for t in rows)
+                yield from (sse("delete",{"id":i},version) for i in deleted)
+            # an id-only message moves Last-Event-ID without firing an event
+            yield f"id: {version}\n\n"
+            end=time.monotonic()+EVENTS_MAX_AGE
+            while (left:=end-time.monotonic())>0:
+                try: yield q.get(timeout=min(15,left))
+                except queue.Empty: yield ": ping\n\n"
+        finally:
+            unsubscribe(q)
+    return Response(stream_with_context(stream()),mimetype="text/event-stream",
+        headers={"Cache-Control":"no-cache","X-Accel-Buffering":"no"})
+
+# ================= METRICS =================
+# METRICS=1 keeps per-route latency histograms, SQL statement counts/time
+# and lock retries, served at /metrics in Prometheus text format.
+# SERVER_TIMING=1 adds the same per-request numbers as a Server-Timing
+# header. Each gunicorn worker counts for itself, so scrape with one worker
+# (-w 1 -k gthread) or treat a scrape as one worker's sample. Streamed
+# responses (exports, /events) are timed up to their first byte.
+LATENCY_BUCKETS = (.001,.0025,.005,.01,.025,.05,.1,.25,.5,1,2.5,5,10)
+_metrics = {}   # (route, method) -> counters below
+_metrics_lock = threading.Lock()
+
+def start_timer():
+    g.t0=time.perf_counter()
+    _sql.queries=0;_sql.seconds=0.0;_sql.retries=0;_sql.waited=0.0
+
+def record_request(resp):
+    took=time.perf_counter()-g.t0
+    route=request.url_rule.rule if request.url_rule else "unmatched"
+    if METRICS:
+        with _metrics_lock:
+            m=_metrics.get((route,request.method))
+            if m is None:
+                m=_metrics[(route,request.method)]={"buckets":[0]*len(LATENCY_BUCKETS),"count":0,"sum":0.0,
+                    "status":{},"queries":0,"sql":0.0,"retries":0,"waited":0.0}
+            i=bisect.bisect_left(LATENCY_BUCKETS,took)
+            if i<len(LATENCY_BUCKETS): m["buckets"][i]+=1
+            m["count"]+=1;m["sum"]+=took
+            m["status"][resp.status_code]=m["status"].get(resp.status_code,0)+1
+            m["queries"]+=_sql.queries;m["sql"]+=_sql.seconds;m["retries"]+=_sql.retries;m["waited"]+=_sql.waited
+    if SERVER_TIMING:
+        resp.headers["Server-Timing"]=(f'db;dur={_sql.seconds*1000:.2f};desc="{_sql.queries} queries", '
+            f'lock;dur={_sql.waited*1000:.2f};desc="{_sql.retries} retries", total;dur={took*1000:.2f}')
+    return resp
+
+def render_metrics():
+    with _metrics_lock:
+        snap=sorted((k,{**m,"buckets":list(m["buckets"]),"status":dict(m["status"])}) for k,m in _metrics.items())
+    out=[]
+    def family(name,kind,help,samples):
+        out.append(f"# HELP {name} {help}");out.append(f"# TYPE {name} {kind}")
+        out.extend(samples)
+    def lbl(route,method,**extra):
+        return ",".join(f'{k}="{v}"' for k,v in {"route":route.replace('"','\\"'),"method":method,**extra}.items())
+    hist=[]
+    for (route,method),m in snap:
+        n=0
+        for le,c in zip(LATENCY_BUCKETS,m["buckets"]):
+            n+=c;hist.append(f'http_request_duration_seconds_bucket{{{lbl(route,method,le=le)}}} {n}')
+        hist.append(f'http_request_duration_seconds_bucket{{{lbl(route,method,le="+Inf")}}} {m["count"]}')
+        hist.append(f'http_request_duration_seconds_sum{{{lbl(route,method)}}} {m["sum"]:.6f}')
+        hist.append(f'http_request_duration_seconds_count{{{lbl(route,method)}}} {m["count"]}')
+    family("http_request_duration_seconds","histogram","Request latency by route.",hist)
+    family("http_requests_total","counter","Requests by route and response status.",
+        [f'http_requests_total{{{lbl(route,method,status=s)}}} {c}' for (route,method),m in snap for s,c in sorted(m["status"].items())])
+    for name,key,help in (("db_queries_total","queries","SQL statements executed."),
+                          ("db_query_seconds_total","sql","Time spent in SQLite."),
+                          ("db_lock_retries_total","retries","Statements retried after waiting for the write lock."),
+                          ("db_lock_wait_seconds_total","waited","Time spent in statements that waited for the write lock.")):
+        family(name,"counter",help,[f'{name}{{{lbl(route,method)}}} {m[key]:.6g}' for (route,method),m in snap])
+    return "\n".join(out)+"\n"
+
+if METRICS or SERVER_TIMING:
+    app.before_request(start_timer)
+    app.after_request(record_request)
+
+if METRICS:
+    @app.route("/metrics")
+    def metrics():
+        return Response(render_metrics(),mimetype="text/plain; version=0.0.4")
+
+# ================= LOGOUT =================
+@app.route("/logout")
+def logout():
+    session.clear()
+    return redirect("/")
+
+# ================= RUN =================
+# Bring the schema up to date once per process, however the app is started
+# (gunicorn, flask run, python web_app.py). init_db is idempotent and the
+# migrations take BEGIN IMMEDIATE, so workers starting together are safe.
+init_db()
+
+if __name__=="__main__":
+    port = int(os.environ.get("PORT", 5000))
+    app.run(host="0.0.0.0", port=port)